@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Browser lifecycle library for Robot Framework test automation.
+Keeps one warm browser per worker and gives every test its own context.
+"""
+
+import os
+import re
+import json
+import zipfile
+from robot.api import logger
+from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn
+
+try:
+    from lazy_import import lazy_import
+except ImportError:
+    from libraries.lazy_import import lazy_import
+
+# Only needed for the memory based recycle check
+psutil = lazy_import('psutil')
+
+
+REQUEST_FILTER_STATS_MARKER = 'REQUEST_FILTER_STATS'
+FAILURE_TRACE_MARKER = 'FAILURE_TRACE'
+
+
+def log_request_filter_stats(builtin):
+    """Logs request filter statistics of the active context for TestMetrics."""
+    try:
+        stats = builtin.run_keyword('Browser.Get Request Filter Stats')
+    except Exception as e:
+        logger.debug(f"Could not read request filter stats: {e}")
+        return
+    logger.info(f"{REQUEST_FILTER_STATS_MARKER} {stats}")
+
+
+def _recompress_trace(raw_path, final_path):
+    """Rewrites a trace zip with maximum compression and returns its size."""
+    with zipfile.ZipFile(raw_path) as source, \
+            zipfile.ZipFile(final_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as target:
+        for item in source.infolist():
+            target.writestr(item.filename, source.read(item.filename))
+    os.remove(raw_path)
+    return os.path.getsize(final_path)
+
+
+class BrowserPool:
+    """
+    Library keeping a single warm Browser library browser for the whole run.
+
+    ``New Browser`` is paid once per worker process. Each test gets a fresh
+    ``New Context``/``New Page`` pair which is closed again in teardown, so
+    cookies, storage and pages never leak between tests. The browser is
+    recycled after ``max_tests`` contexts or when the Playwright process tree
+    grows beyond ``max_memory_mb``. Robot processes started through
+    ``browser_server.py run`` connect to the server's warm browser instead
+    of launching one; that browser runs under the server, which enforces
+    its memory limit, so ``max_memory_mb`` does not apply to it.
+
+    With ``TRACE_ON_FAILURE=True`` every context is traced, but the trace is
+    only written to ``${OUTPUT_DIR}/traces`` (or ``TRACE_DIR``) when the test failed or a
+    LoggerLibrary failure path asked for it. Passing tests leave nothing on
+    disk; persisted traces are recompressed and capped by
+    ``TRACE_MAX_TOTAL_MB`` per run.
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self, max_tests=None, max_memory_mb=None):
+        """
+        Initialize the BrowserPool library.
+
+        Arguments:
+            max_tests: Contexts served before the browser is relaunched (0 disables, default 50)
+            max_memory_mb: RSS limit of the Playwright process tree in MB (0 disables, default 1024)
+        """
+        self._builtin = BuiltIn()
+        self._max_tests = int(max_tests if max_tests is not None
+                              else os.getenv('BROWSER_POOL_MAX_TESTS', '50'))
+        self._max_memory_mb = int(max_memory_mb if max_memory_mb is not None
+                                  else os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '1024'))
+        self._browser_id = None
+        self._browser_key = None
+        self._context_id = None
+        self._filtered = False
+        self._served = 0
+        self._launches = 0
+        self._contexts = 0  # Never reset, unlike _served, so per-context file names stay unique
+        self._har_dir = os.getenv('HAR_RECORD_DIR')
+        # Warm browsers leased from resources/libraries/browser_server.py, by "<browser>:headless|headed"
+        self._server_endpoints = json.loads(os.getenv('BROWSER_SERVER_ENDPOINTS') or '{}')
+        self._connected = False
+        self._trace_on_failure = os.getenv('TRACE_ON_FAILURE', 'False').lower() == 'true'
+        self._trace_screenshots = os.getenv('TRACE_SCREENSHOTS', 'True').lower() == 'true'
+        self._trace_budget = int(os.getenv('TRACE_MAX_TOTAL_MB', '200')) * 1024 * 1024
+        self._trace_bytes = 0
+        self._tracing = False
+
+    @keyword
+    def acquire_warm_browser(self, browser='chromium', headless=True):
+        """
+        Returns the id of the pooled browser, launching it only when needed.
+
+        A new browser is started on first use, when a different browser type
+        or headless mode is requested, or after the pool decided to recycle.
+
+        Arguments:
+            browser: Browser type (chromium, firefox, webkit)
+            headless: Whether to run headless
+
+        Example:
+            ${id}=    Acquire Warm Browser    chromium    headless=${True}
+        """
+        key = (str(browser), str(headless).lower() == 'true')
+        if self._browser_id and self._browser_key != key:
+            logger.info(f"Browser pool configuration changed to {key}, relaunching")
+            self.close_browser_pool()
+        if self._browser_id and self._needs_recycle():
+            self.close_browser_pool()
+        if not self._browser_id:
+            endpoint = self._server_endpoints.get(f"{key[0]}:{'headless' if key[1] else 'headed'}")
+            self._connected = bool(endpoint)
+            if endpoint:
+                self._builtin.run_keyword('Browser.Connect To Browser', endpoint, key[0])
+                self._browser_id = self._builtin.run_keyword('Browser.Get Browser Ids', 'ACTIVE')[0]
+                if self._max_memory_mb and self._launches == 0:
+                    logger.info("Connected to the browser server's browser; its memory limit "
+                                "(--browser-max-memory-mb) applies instead of max_memory_mb")
+            else:
+                self._browser_id = self._builtin.run_keyword(
+                    'Browser.New Browser', key[0], f'headless={key[1]}')
+            self._browser_key = key
+            self._served = 0
+            self._launches += 1
+            logger.info(f"Browser pool {'connected to' if endpoint else 'launched'} {key[0]} "
+                        f"(launch #{self._launches})")
+        else:
+            self._builtin.run_keyword('Browser.Switch Browser', self._browser_id)
+        return self._browser_id
+
+    @keyword
+    def open_isolated_context(self, url=None, request_filter=None, **context_args):
+        """
+        Opens a fresh context (and a page) in the pooled browser.
+
+        Any context still open from a previous test is closed first.
+        Extra named arguments are passed to ``New Context`` as is. When
+        ``HAR_RECORD_DIR`` is set, traffic of the context is recorded to a
+        HAR file there (written when the context is released).
+
+        A non-empty ``request_filter`` profile (see ``Get Browser Config``)
+        is applied to the context before the page is opened. Requires the
+        Browser library to be imported with the ``browser_extensions.js``
+        extension.
+
+        Arguments:
+            url: Optional URL for the new page
+            request_filter: Request filtering profile dictionary
+            context_args: Named arguments for ``New Context``
+
+        Example:
+            Open Isolated Context    ${url}    viewport={'width': 1920, 'height': 1080}
+        """
+        if not self._browser_id:
+            raise RuntimeError("No pooled browser. Call 'Acquire Warm Browser' first.")
+        if self._context_id:
+            self.release_isolated_context()
+        if self._har_dir and 'recordHar' not in context_args:
+            os.makedirs(self._har_dir, exist_ok=True)
+            har_path = os.path.abspath(os.path.join(self._har_dir, f"context-{os.getpid()}-{self._contexts}.har"))
+            context_args['recordHar'] = {'path': har_path, 'omitContent': False}
+        args = [f'{name}={value}' for name, value in context_args.items()]
+        self._context_id = self._builtin.run_keyword('Browser.New Context', *args)
+        self._served += 1
+        self._contexts += 1
+        self._filtered = bool(request_filter)
+        if self._filtered:
+            # Passed as a dict: run_keyword would resolve escapes (the \. of URL patterns) in a JSON string
+            self._builtin.run_keyword('Browser.Apply Request Filter', request_filter)
+        self._tracing = self._trace_on_failure
+        if self._tracing:
+            self._builtin.run_keyword('Browser.Start Failure Trace', self._trace_screenshots)
+        if url:
+            self._builtin.run_keyword('Browser.New Page', url)
+        else:
+            self._builtin.run_keyword('Browser.New Page')
+        return self._context_id
+
+    @keyword
+    def release_isolated_context(self):
+        """
+        Closes the context opened for the current test and keeps the browser.
+
+        Safe to use as test teardown even if setup failed before a context
+        was created.
+
+        Example:
+            Test Teardown    Release Isolated Context
+        """
+        if not self._context_id:
+            return
+        if self._filtered:
+            log_request_filter_stats(self._builtin)
+        if self._tracing:
+            self._finish_trace()
+        try:
+            self._builtin.run_keyword('Browser.Close Context', self._context_id, self._browser_id)
+        except Exception as e:
+            # A broken context usually means a broken browser; start over next time
+            logger.warn(f"Failed to close pooled context, discarding browser: {e}")
+            self._discard()
+        self._context_id = None
+
+    @keyword
+    def close_browser_pool(self):
+        """
+        Closes the pooled browser. Use as suite teardown.
+
+        Example:
+            Suite Teardown    Close Browser Pool
+        """
+        if not self._browser_id:
+            return
+        logger.info(f"Closing pooled browser after {self._served} context(s)")
+        try:
+            self._builtin.run_keyword('Browser.Switch Browser', self._browser_id)
+            self._builtin.run_keyword('Browser.Close Browser', 'CURRENT')
+        except Exception as e:
+            logger.warn(f"Failed to close pooled browser: {e}")
+        self._discard()
+
+    @keyword
+    def get_browser_pool_stats(self):
+        """
+        Returns pool statistics as a dictionary.
+
+        Example:
+            ${stats}=    Get Browser Pool Stats
+            Log    Launched ${stats}[launches] browser(s)
+        """
+        return {
+            'browser_id': self._browser_id,
+            'launches': self._launches,
+            'contexts_served': self._served,
+            # A connected browser is not a child of this process; see the browser server's /health
+            'memory_mb': None if self._connected else round(self._process_tree_memory_mb(), 1),
+        }
+
+    def _finish_trace(self):
+        """Stops tracing and keeps the trace only for failed tests."""
+        self._tracing = False
+        failed = (self._builtin.get_variable_value('${TEST STATUS}') == 'FAIL'
+                  or self._builtin.get_variable_value('${FAILURE_TRACE_REQUESTED}', False))
+        if not failed:
+            try:
+                self._builtin.run_keyword('Browser.Stop Failure Trace', '')
+            except Exception as e:
+                logger.debug(f"Could not discard trace: {e}")
+            return
+        # TRACE_DIR lets parallel workers share the traces directory of the merged output
+        trace_dir = os.getenv('TRACE_DIR') or os.path.join(self._builtin.get_variable_value('${OUTPUT_DIR}'), 'traces')
+        test_name = self._builtin.get_variable_value('${TEST NAME}', 'context')
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', test_name).strip('_')[:80]
+        file_name = f"{slug}-{os.getpid()}-{self._contexts}.zip"
+        relative = f"traces/{file_name}"
+        final_path = os.path.join(trace_dir, file_name)
+        raw_path = f"{final_path}.raw"
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        try:
+            self._builtin.run_keyword('Browser.Stop Failure Trace', os.path.abspath(raw_path))
+        except Exception as e:
+            logger.warn(f"Failed to save failure trace: {e}")
+            return
+        try:
+            size = _recompress_trace(raw_path, final_path)
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.warn(f"Failed to compress failure trace {raw_path}: {e}")
+            return
+        if self._trace_bytes + size > self._trace_budget:
+            logger.warn(f"Trace budget of {self._trace_budget // (1024 * 1024)} MB exhausted, "
+                        f"dropping trace for '{test_name}'")
+            os.remove(final_path)
+            return
+        self._trace_bytes += size
+        logger.info(f"{FAILURE_TRACE_MARKER} {relative}")
+
+    def _needs_recycle(self):
+        """Checks the test count and memory limits of the current browser."""
+        if self._max_tests and self._served >= self._max_tests:
+            logger.info(f"Recycling pooled browser after {self._served} context(s)")
+            return True
+        if self._max_memory_mb and not self._connected:
+            memory_mb = self._process_tree_memory_mb()
+            if memory_mb > self._max_memory_mb:
+                logger.info(f"Recycling pooled browser, memory {memory_mb:.0f} MB > {self._max_memory_mb} MB")
+                return True
+        return False
+
+    def _process_tree_memory_mb(self) -> float:
+        """Sums the RSS of all child processes (Playwright node process and browsers)."""
+        total = 0
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except psutil.Error as e:
+            logger.debug(f"Could not read process tree memory: {e}")
+        return total / (1024 * 1024)
+
+    def _discard(self):
+        self._tracing = False
+        self._browser_id = None
+        self._browser_key = None
+        self._context_id = None
+        self._served = 0
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent page branches for Robot Framework test automation.
+Runs independent page checks side by side, each on its own page of the active context.
+"""
+
+import json
+from html import escape
+from robot.api import logger
+from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import timestr_to_secs
+
+STEP_ACTIONS = ('goto', 'wait', 'click', 'fill', 'text', 'count', 'url', 'title')
+
+
+class ConcurrentPages:
+    """
+    Library for running groups of independent page checks concurrently.
+
+    A branch is a named list of steps (goto, wait, click, fill, text, count,
+    url, title) run on its own new page of the active context. All branches
+    run inside the Browser library's node process at the same time, so a
+    group takes as long as its slowest branch. Robot keywords themselves are
+    not thread-safe, which is why branches are step lists and not keywords.
+    Requires ``Library    Browser    jsextension=.../browser_extensions.js``.
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self):
+        """Initialize the ConcurrentPages library."""
+        self._builtin = BuiltIn()
+
+    @keyword
+    def new_page_branch(self, name, url=None, timeout='30s'):
+        """
+        Creates a branch that opens a new page, optionally navigating to a URL first.
+
+        Arguments:
+            name: Branch name used in results and logs
+            url: URL to open before the other steps
+            timeout: Time budget of the whole branch
+
+        Example:
+            ${cart}=    New Page Branch    cart    ${BASE_URL}/cart.html    timeout=10s
+        """
+        branch = {'name': name, 'timeout_ms': int(timestr_to_secs(timeout) * 1000), 'steps': []}
+        if url:
+            branch['steps'].append({'action': 'goto', 'value': url})
+        return branch
+
+    @keyword
+    def add_branch_step(self, branch, action, selector=None, value=None, state='visible', timeout=None):
+        """
+        Appends a step to a branch and returns the branch.
+
+        Arguments:
+            branch: Branch created with New Page Branch
+            action: One of goto, wait, click, fill, text, count, url, title
+            selector: Element selector for wait, click, fill, text and count
+            value: URL for goto, text for fill
+            state: Element state for wait
+            timeout: Timeout of this step (defaults to Playwright's)
+
+        Example:
+            Add Branch Step    ${cart}    wait    ${CART_LIST}
+            Add Branch Step    ${cart}    count    ${CART_ITEM}
+        """
+        if action not in STEP_ACTIONS:
+            raise ValueError(f"Unknown branch step action '{action}', expected one of {', '.join(STEP_ACTIONS)}")
+        step = {'action': action, 'selector': selector, 'value': value, 'state': state}
+        if timeout:
+            step['timeout_ms'] = int(timestr_to_secs(timeout) * 1000)
+        branch['steps'].append(step)
+        return branch
+
+    @keyword
+    def run_page_branches_concurrently(self, *branches, cancel_on_failure=True, fail_on_error=True):
+        """
+        Runs branches concurrently and returns their results by branch name.
+
+        Each result holds status (PASS, FAIL or CANCELLED), elapsed_ms, error
+        and the steps with their elapsed_ms and result (text, count, url, ...).
+
+        Arguments:
+            branches: Branches created with New Page Branch
+            cancel_on_failure: Cancel the other branches as soon as one fails
+            fail_on_error: Fail the keyword when any branch did not pass
+
+        Example:
+            ${results}=    Run Page Branches Concurrently    ${inventory}    ${cart}    ${details}
+            Should Be Equal    ${results}[cart][steps][1][result]    ${1}
+        """
+        names = [branch['name'] for branch in branches]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Branch names must be unique: {', '.join(names)}")
+        # A list, not JSON: run_keyword would resolve escapes and ${...} in a string argument again
+        raw = self._builtin.run_keyword('Browser.Run Concurrent Branches', list(branches), cancel_on_failure)
+        outcome = json.loads(raw)
+        results = {result['name']: result for result in outcome['branches']}
+        self._log_results(outcome)
+        failed = [r for r in outcome['branches'] if r['status'] != 'PASS']
+        if failed and fail_on_error:
+            raise AssertionError('; '.join(f"{r['name']}: {r['status']} {r['error'] or ''}".strip() for r in failed))
+        return results
+
+    def _log_results(self, outcome):
+        """Logs one table row per branch step, grouped by branch, in branch order."""
+        rows = []
+        for branch in outcome['branches']:
+            rows.append(f"<tr><th>{escape(branch['name'])}</th><th>{branch['status']}</th>"
+                        f"<th>{branch['elapsed_ms']} ms</th><th>{escape(branch['error'] or '')}</th></tr>")
+            for step in branch['steps']:
+                target = step.get('selector') or step.get('value') or ''
+                result = '' if step['result'] is None else step['result']
+                rows.append(f"<tr><td></td><td>{escape(step['action'])} {escape(str(target))}</td>"
+                            f"<td>{step['elapsed_ms']} ms</td><td>{escape(str(result))}</td></tr>")
+        logger.info(f"<table>{''.join(rows)}</table>", html=True)
+        logger.info(f"{len(outcome['branches'])} branch(es) finished in {outcome['elapsed_ms']} ms")
@@ -10,6 +10,11 @@ import os
 from typing import Dict, Any
 from robot.api.deco import keyword
 
+try:
+    from LocalStandIn import LocalStandInServer
+except ImportError:
+    from libraries.LocalStandIn import LocalStandInServer
+
 class Config:
     """Configuration library for managing test environment settings."""
     
@@ -20,11 +25,31 @@ class Config:
         self.env = os.getenv('TEST_ENV', 'staging')
         self.browser = os.getenv('BROWSER', 'chromium')
         self.headless = os.getenv('HEADLESS', 'True').lower() == 'true'
+        self.request_filter = os.getenv('REQUEST_FILTER', 'off')
+        # Overrides the environment URL, e.g. a stand-in shared by load test users
+        self.base_url = os.getenv('BASE_URL', '').rstrip('/')
         
-        # Environment URLs
+        # Environment URLs ('local' is resolved when the stand-in starts)
         self._urls = {
             'staging': 'https://www.saucedemo.com',
-            'prod': 'https://www.saucedemo.com'
+            'prod': 'https://www.saucedemo.com',
+            'local': None
+        }
+        self._local_server = None
+        
+        # Request filtering profiles applied at context creation
+        self._request_filters = {
+            'off': {},
+            'lean': {
+                'block_types': ['image', 'font', 'media'],
+                'block_urls': [r'google-analytics\.com', r'googletagmanager\.com', r'backtrace\.io'],
+                'stub_urls': []
+            },
+            'minimal': {
+                'block_types': ['image', 'font', 'media', 'stylesheet', 'manifest'],
+                'block_urls': [r'google-analytics\.com', r'googletagmanager\.com', r'backtrace\.io'],
+                'stub_urls': [r'/service-worker\.js']
+            }
         }
         
         # Test users
@@ -48,12 +73,19 @@ class Config:
         """
         Get the base URL for the current environment.
         
+        BASE_URL overrides the environment. With TEST_ENV=local the recorded
+        local stand-in server is started on first use and its URL is returned.
+        
         Returns:
             str: Base URL for the current environment
             
         Example:
             ${BASE_URL}=    Get Base URL
         """
+        if self.base_url:
+            return self.base_url
+        if self.env == 'local':
+            return self._start_local_stand_in()
         return self._urls.get(self.env, self._urls['staging'])
     
     @keyword
@@ -78,6 +110,9 @@ class Config:
         """
         Get browser configuration for test execution.
         
+        The request_filter entry holds the blocking profile selected with
+        REQUEST_FILTER (off, lean, minimal); it is empty when filtering is off.
+        
         Returns:
             dict: Browser configuration settings
             
@@ -87,16 +122,35 @@ class Config:
         """
         return {
             'browser': self.browser,
-            'headless': self.headless
+            'headless': self.headless,
+            'request_filter': self._request_filters.get(self.request_filter, {})
         }
     
+    @keyword
+    def get_request_filter_profile(self, name: str) -> Dict[str, Any]:
+        """
+        Get a request filtering profile by name, regardless of REQUEST_FILTER.
+        
+        Args:
+            name: Profile name (off, lean, minimal)
+            
+        Returns:
+            dict: The profile's block_types, block_urls and stub_urls
+            
+        Example:
+            ${profile}=    Get Request Filter Profile    lean
+        """
+        if name not in self._request_filters:
+            raise ValueError(f"Invalid request filter: {name}. Valid options: {', '.join(self._request_filters)}")
+        return self._request_filters[name]
+    
     @keyword
     def set_test_environment(self, env: str) -> None:
         """
         Set the test environment.
         
         Args:
-            env: Environment name (staging, prod)
+            env: Environment name (staging, prod, local)
             
         Example:
             Set Test Environment    prod
@@ -104,4 +158,13 @@ class Config:
         if env in self._urls:
             self.env = env
         else:
-            raise ValueError(f"Invalid environment: {env}. Valid options: {', '.join(self._urls.keys())}") 
\ No newline at end of file
+            raise ValueError(f"Invalid environment: {env}. Valid options: {', '.join(self._urls.keys())}")
+    
+    def _start_local_stand_in(self) -> str:
+        """Start the local stand-in server once per process and return its URL."""
+        if not self._local_server:
+            self._local_server = LocalStandInServer(
+                port=os.getenv('LOCAL_STANDIN_PORT', '0'),
+                latency_ms=os.getenv('LOCAL_STANDIN_LATENCY_MS', '0')
+            )
+        return self._local_server.start()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Listener that reruns failed tests right away in the same robot process.
+
+A failed test is re-inserted directly after itself, so the retry reuses
+the warm browser of BrowserPool instead of a whole new CI job. Failed
+attempts are dropped from output.xml when it is closed; the final result
+carries a ``[RERUN]`` line that TestMetrics turns into flaky/failed
+classification and flakiness rates.
+
+Usage:
+    robot --listener libraries/FlakyRerun.py tests/e2e
+    robot --listener libraries/FlakyRerun.py:3 tests/e2e
+"""
+
+import os
+from robot.api import ExecutionResult, ResultVisitor, logger
+
+# First line of the final result of a retried test, parsed by TestMetrics
+RERUN_MARKER = '[RERUN]'
+# Message of failed attempts that are removed from output.xml
+RETRIED_MARKER = '[RERUN RETRIED]'
+NO_RERUN_TAG = 'no-rerun'
+
+
+class _RemoveRetriedAttempts(ResultVisitor):
+
+    def __init__(self):
+        self.removed = 0
+
+    def start_suite(self, suite):
+        kept = [test for test in suite.tests if not test.message.startswith(RETRIED_MARKER)]
+        self.removed += len(suite.tests) - len(kept)
+        suite.tests = kept
+
+
+class FlakyRerun:
+    """
+    Reruns failed tests up to ``max_retries`` times (defaults to TEST_RETRIES or 1).
+
+    Tests tagged ``no-rerun`` are never retried.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, max_retries=None):
+        self.max_retries = int(max_retries if max_retries is not None else os.getenv('TEST_RETRIES', '1'))
+        self._failures = []
+
+    def end_test(self, data, result):
+        if result.skipped:
+            return
+        if result.failed and len(self._failures) < self.max_retries and NO_RERUN_TAG not in result.tags:
+            self._failures.append(result.message)
+            attempt = len(self._failures)
+            logger.info(f"Rerunning '{result.name}' ({attempt}/{self.max_retries}) after failure: {result.message}")
+            result.status = 'SKIP'
+            result.message = f"{RETRIED_MARKER} attempt {attempt} failed: {result.message}"
+            data.parent.tests.insert(data.parent.tests.index(data) + 1, data.deepcopy())
+            return
+        if self._failures:
+            attempts = len(self._failures) + 1
+            if result.passed:
+                earlier = '\n'.join(f"Attempt {n}: {msg}" for n, msg in enumerate(self._failures, 1))
+                result.message = f"{RERUN_MARKER} flaky after {attempts} attempts\n{earlier}"
+            else:
+                result.message = f"{RERUN_MARKER} failed after {attempts} attempts\n{result.message}"
+        self._failures = []
+
+    def output_file(self, path):
+        """Drops the failed attempts, so retries are not counted as separate tests."""
+        result = ExecutionResult(str(path))
+        remover = _RemoveRetriedAttempts()
+        result.visit(remover)
+        if remover.removed:
+            result.save()
+
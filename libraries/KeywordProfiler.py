@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Listener that samples Python stacks while selected keywords run.
+
+A background thread samples the robot thread every few milliseconds
+while a keyword matching KEYWORD_PROFILE runs (or a top-level keyword of
+a test tagged with KEYWORD_PROFILE_TAGS). Samples are attributed to the
+Robot keyword stack and written as collapsed stacks per keyword
+(``<name>.collapsed``, input for flamegraph.pl or speedscope), plus
+``summary.json``. A ``KEYWORD_PROFILE`` message per profiled call feeds
+the metrics report.
+
+Usage:
+    KEYWORD_PROFILE='LoggerLibrary.*,Get Browser Config' robot --listener libraries/KeywordProfiler.py tests/e2e
+    robot --listener libraries/KeywordProfiler.py:tags=smoke tests/e2e
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from collections import Counter, defaultdict
+import robot
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import MultiMatcher
+
+# Marker picked up by TestMetrics
+KEYWORD_PROFILE_MARKER = 'KEYWORD_PROFILE'
+# Frames of Robot Framework itself, the interpreter startup and this listener are noise in every stack
+_SKIPPED_FILES = (os.path.dirname(robot.__file__) + os.sep, threading.__file__, os.path.abspath(__file__), '<frozen ')
+TOP_FUNCTIONS = 10
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples one thread's Python stack while ``active`` is set.
+
+    Each sample carries the time actually elapsed since the previous one
+    (or since ``start``), which drifts above the interval with sleep
+    jitter and GIL contention.
+    """
+
+    def __init__(self, interval, on_sample):
+        super().__init__(name='keyword-profiler', daemon=True)
+        self.interval = interval
+        self.active = threading.Event()
+        self.target = None
+        self._since = time.perf_counter()
+        self._on_sample = on_sample
+
+    def start_sampling(self, target):
+        self.target = target
+        self._since = time.perf_counter()
+        self.active.set()
+
+    def run(self):
+        while True:
+            self.active.wait()
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.target)
+            if frame is not None and self.active.is_set():
+                now = time.perf_counter()
+                elapsed, self._since = now - self._since, now
+                self._on_sample(frame, elapsed)
+
+
+class KeywordProfiler:
+    """
+    Sampling profiler for keywords selected by name pattern or test tag.
+
+    Arguments:
+        keywords: Comma separated keyword name patterns (defaults to KEYWORD_PROFILE)
+        tags: Comma separated tag patterns (defaults to KEYWORD_PROFILE_TAGS)
+        interval_ms: Sampling interval (defaults to KEYWORD_PROFILE_INTERVAL_MS or 5)
+        output_dir: Directory for profiles (defaults to KEYWORD_PROFILE_DIR or ${OUTPUT_DIR}/profiles)
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, keywords=None, tags=None, interval_ms=None, output_dir=None):
+        self._keywords = MultiMatcher(_split(keywords if keywords is not None else os.getenv('KEYWORD_PROFILE')),
+                                      ignore='_')
+        self._tags = _split(tags if tags is not None else os.getenv('KEYWORD_PROFILE_TAGS'))
+        self._interval = float(interval_ms or os.getenv('KEYWORD_PROFILE_INTERVAL_MS', '5')) / 1000.0
+        self._output_dir = output_dir or os.getenv('KEYWORD_PROFILE_DIR')
+        self._kw_stack = []
+        self._root = None  # Index of the profiled keyword in _kw_stack
+        self._test_selected = False
+        self._call_samples = Counter()
+        self._call_time = 0.0  # Seconds covered by the samples of the current call
+        self._stacks = defaultdict(Counter)  # profiled keyword -> collapsed stack -> samples
+        self._summary = {}
+        self._lock = threading.Lock()
+        self._sampler = _Sampler(self._interval, self._sample)
+        self._sampler.start()
+
+    def start_suite(self, data, result):
+        if not self._output_dir:
+            self._output_dir = os.path.join(BuiltIn().get_variable_value('${OUTPUT_DIR}'), 'profiles')
+
+    def start_test(self, data, result):
+        self._test_selected = bool(self._tags) and result.tags.match(self._tags)
+
+    def end_test(self, data, result):
+        self._test_selected = False
+
+    def start_keyword(self, data, result):
+        name = result.full_name
+        self._kw_stack.append(name)
+        if self._root is not None:
+            return
+        by_tag = self._test_selected and len(self._kw_stack) == 1
+        if by_tag or self._keywords.match_any([result.name, name]):
+            self._root = len(self._kw_stack) - 1
+            self._sampler.start_sampling(threading.get_ident())
+
+    def end_keyword(self, data, result):
+        if self._root == len(self._kw_stack) - 1:
+            self._sampler.active.clear()
+            self._finish_call(self._kw_stack[self._root])
+            self._root = None
+        self._kw_stack.pop()
+
+    def _sample(self, frame, elapsed):
+        root = self._root
+        if root is None:
+            return
+        python_stack = []
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if not filename.startswith(_SKIPPED_FILES):
+                python_stack.append(f"{os.path.basename(filename)}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        python_stack.reverse()
+        with self._lock:
+            self._call_samples[tuple(self._kw_stack[root:]) + tuple(python_stack)] += 1
+            self._call_time += elapsed
+
+    def _finish_call(self, name):
+        with self._lock:
+            samples, self._call_samples = self._call_samples, Counter()
+            sampled_time, self._call_time = self._call_time, 0.0
+        total = sum(samples.values())
+        leaves = Counter()
+        for stack, count in samples.items():
+            self._stacks[name][';'.join(stack)] += count
+            leaves[stack[-1]] += count
+        summary = self._summary.setdefault(name, {'calls': 0, 'samples': 0, 'sampled_time': 0.0,
+                                                  'functions': Counter()})
+        summary['calls'] += 1
+        summary['samples'] += total
+        summary['sampled_time'] += sampled_time
+        summary['functions'].update(leaves)
+        payload = {'keyword': name, 'samples': total, 'interval_ms': self._interval * 1000,
+                   'sampled_time': round(sampled_time, 3),
+                   'top': leaves.most_common(TOP_FUNCTIONS)}
+        logger.info(f"{KEYWORD_PROFILE_MARKER} {json.dumps(payload)}")
+
+    def close(self):
+        self._sampler.active.clear()
+        if not self._stacks:
+            return
+        os.makedirs(self._output_dir, exist_ok=True)
+        for name, stacks in self._stacks.items():
+            slug = re.sub(r'[^\w.-]+', '_', name).strip('_') or 'keyword'
+            with open(os.path.join(self._output_dir, f"{slug}.collapsed"), 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        summary = {name: {'calls': s['calls'], 'samples': s['samples'],
+                          'sampled_time': round(s['sampled_time'], 3),
+                          'top_functions': s['functions'].most_common(TOP_FUNCTIONS)}
+                   for name, s in self._summary.items()}
+        with open(os.path.join(self._output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
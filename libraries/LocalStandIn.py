@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hermetic local stand-in for the application under test.
+
+Pages and assets are recorded once into a HAR file (see ``HAR_RECORD_DIR``
+in BrowserPool), extracted into a fixture directory and then served by an
+in-process HTTP server. ``TEST_ENV=local`` in Config switches the suites to it.
+
+Usage:
+    python libraries/LocalStandIn.py extract <har_file_or_dir> <fixture_dir>
+    python libraries/LocalStandIn.py serve <fixture_dir> [--port 8765]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from robot.api import logger
+from robot.api.deco import keyword
+
+DEFAULT_FIXTURE_DIR = Path(__file__).resolve().parent.parent / 'resources' / 'fixtures' / 'saucedemo'
+INDEX_FILE = 'index.json'
+
+
+def _request_key(method: str, path: str) -> str:
+    return f"{method.upper()} {path}"
+
+
+def extract_har(har_path: Path, fixture_dir: Path, origin: Optional[str] = None) -> int:
+    """
+    Extracts HAR entries into a fixture directory.
+
+    Bodies are stored once per content hash under ``bodies/``; ``index.json``
+    maps ``METHOD /path?query`` to status, content type and body file.
+    Only entries of ``origin`` are kept (defaults to the first page's origin).
+
+    Returns:
+        int: Number of entries written to the index
+    """
+    har_files = sorted(har_path.rglob('*.har')) if har_path.is_dir() else [har_path]
+    bodies_dir = fixture_dir / 'bodies'
+    bodies_dir.mkdir(parents=True, exist_ok=True)
+    index_path = fixture_dir / INDEX_FILE
+    index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+
+    for har_file in har_files:
+        entries = json.loads(har_file.read_text(encoding='utf-8')).get('log', {}).get('entries', [])
+        for entry in entries:
+            request, response = entry['request'], entry['response']
+            url = urlparse(request['url'])
+            entry_origin = f"{url.scheme}://{url.netloc}"
+            origin = origin or entry_origin
+            if entry_origin != origin or response.get('status', 0) <= 0:
+                continue
+            content = response.get('content', {})
+            text = content.get('text', '')
+            body = base64.b64decode(text) if content.get('encoding') == 'base64' else text.encode('utf-8')
+            digest = hashlib.sha1(body).hexdigest()
+            body_file = bodies_dir / digest
+            if not body_file.exists():
+                body_file.write_bytes(body)
+            path = url.path + (f"?{url.query}" if url.query else '')
+            index[_request_key(request['method'], path)] = {
+                'status': response['status'],
+                'content_type': content.get('mimeType') or 'application/octet-stream',
+                'body': f"bodies/{digest}",
+            }
+
+    index_path.write_text(json.dumps(index, indent=2, sort_keys=True), encoding='utf-8')
+    return len(index)
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serves recorded responses; unknown ``.html`` paths fall back to ``/``."""
+
+    fixture_dir: Path = DEFAULT_FIXTURE_DIR
+    index: Dict[str, dict] = {}
+    latency: float = 0.0
+
+    def do_GET(self):
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body=True):
+        if self.latency:
+            time.sleep(self.latency)
+        entry = (self.index.get(_request_key('GET', self.path))
+                 or self.index.get(_request_key('GET', urlparse(self.path).path)))
+        if entry is None and urlparse(self.path).path.endswith('.html'):
+            # Client side routes of the SPA are served by the root document
+            entry = self.index.get(_request_key('GET', '/'))
+        if entry is None:
+            self.send_error(404, 'Not recorded')
+            return
+        body = (self.fixture_dir / entry['body']).read_bytes()
+        self.send_response(entry['status'])
+        self.send_header('Content-Type', entry['content_type'])
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Local stand-in: {format % args}")
+
+
+class LocalStandInServer:
+    """In-process HTTP server replaying a fixture directory."""
+
+    def __init__(self, fixture_dir=None, port=0, latency_ms=0):
+        self.fixture_dir = Path(fixture_dir or os.getenv('LOCAL_STANDIN_FIXTURES', DEFAULT_FIXTURE_DIR))
+        self.port = int(port)
+        self.latency = int(latency_ms) / 1000.0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> Optional[str]:
+        if not self._server:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        if self._server:
+            return self.url
+        index_path = self.fixture_dir / INDEX_FILE
+        if not index_path.exists():
+            raise RuntimeError(f"No recorded fixtures at {index_path}. "
+                               f"Record a HAR and run 'LocalStandIn.py extract' first.")
+        handler = type('FixtureHandler', (_FixtureHandler,), {
+            'fixture_dir': self.fixture_dir,
+            'index': json.loads(index_path.read_text(encoding='utf-8')),
+            'latency': self.latency,
+        })
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Local stand-in serving {self.fixture_dir} at {self.url}")
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+
+class LocalStandIn:
+    """
+    Library exposing the local stand-in server to Robot Framework.
+
+    Config starts the server on its own when ``TEST_ENV=local``; these
+    keywords are for suites that want to control it explicitly.
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self, fixture_dir=None):
+        self._server = LocalStandInServer(
+            fixture_dir,
+            port=os.getenv('LOCAL_STANDIN_PORT', '0'),
+            latency_ms=os.getenv('LOCAL_STANDIN_LATENCY_MS', '0'))
+
+    @keyword
+    def start_local_stand_in(self) -> str:
+        """
+        Starts the local stand-in server and returns its base URL.
+
+        Example:
+            ${url}=    Start Local Stand In
+        """
+        return self._server.start()
+
+    @keyword
+    def stop_local_stand_in(self) -> None:
+        """
+        Stops the local stand-in server.
+
+        Example:
+            Suite Teardown    Stop Local Stand In
+        """
+        self._server.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Record/replay local stand-in for the application under test.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    extract = subparsers.add_parser('extract', help='Extract HAR file(s) into a fixture directory')
+    extract.add_argument('har_path', type=Path, help='HAR file or directory containing HAR files')
+    extract.add_argument('fixture_dir', type=Path, nargs='?', default=DEFAULT_FIXTURE_DIR,
+                         help='Fixture directory (default: resources/fixtures/saucedemo)')
+    extract.add_argument('--origin', help='Only keep entries of this origin (default: first entry origin)')
+    serve = subparsers.add_parser('serve', help='Serve a fixture directory until interrupted')
+    serve.add_argument('fixture_dir', type=Path, nargs='?', default=DEFAULT_FIXTURE_DIR)
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'extract':
+        count = extract_har(args.har_path, args.fixture_dir, args.origin)
+        print(f"Wrote {count} recorded responses to {args.fixture_dir}")
+        return 0
+
+    server = LocalStandInServer(args.fixture_dir, args.port, args.latency_ms)
+    print(f"Serving {args.fixture_dir} at {server.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
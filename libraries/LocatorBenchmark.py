@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Locator benchmark for Robot Framework test automation.
+
+Resolves locators repeatedly against recorded page snapshots (static
+HTML without scripts) in the current browser page, and ranks them by
+resolution time, flagging slow, ambiguous, strict-mode-violating,
+missing and invalid selectors.
+"""
+
+import os
+import re
+import json
+from html import escape
+from pathlib import Path
+from statistics import median
+from robot.api import logger, SkipExecution
+from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn
+from robot.running import ResourceFileBuilder
+from robot.utils import MultiMatcher
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / 'resources' / 'snapshots'
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+# Text and substring matching may hit unrelated elements when the page changes
+FUZZY_SELECTOR_RE = re.compile(r'^text=[^"\']|:has-text\(|:text\(|contains\(|[*^$]=|>>\s*nth=|:nth-')
+FLAGS = ('error', 'missing', 'strict', 'ambiguous', 'slow')
+
+
+class LocatorBenchmark:
+    """
+    Library for benchmarking locators against recorded page snapshots.
+
+    Snapshots are recorded once from the live (or local stand-in) pages
+    with Record Page Snapshot and loaded from file afterwards, so timings
+    compare selectors on identical DOMs without network noise. Times are
+    net of a no-op round trip to the page.
+    Requires ``Library    Browser    jsextension=.../browser_extensions.js``.
+
+    Arguments:
+        snapshot_dir: Snapshot directory (defaults to LOCATOR_SNAPSHOT_DIR or resources/snapshots)
+        repeat: Resolutions per locator and snapshot (defaults to LOCATOR_BENCH_REPEAT or 20)
+        slow_ms: Net median time flagging a locator as slow (defaults to LOCATOR_SLOW_MS or 1)
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self, snapshot_dir=None, repeat=None, slow_ms=None):
+        """Initialize the LocatorBenchmark library."""
+        self.snapshot_dir = Path(snapshot_dir or os.getenv('LOCATOR_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+        self.repeat = int(repeat or os.getenv('LOCATOR_BENCH_REPEAT', '20'))
+        self.slow_ms = float(slow_ms or os.getenv('LOCATOR_SLOW_MS', '1'))
+        self._builtin = BuiltIn()
+        self._results = {}  # locator name -> {'selector': ..., 'snapshots': {snapshot: stats}}
+
+    @keyword
+    def record_page_snapshot(self, name):
+        """
+        Saves the current page's DOM without scripts as a named snapshot.
+
+        Arguments:
+            name: Snapshot name, e.g. the page (login, inventory, cart)
+
+        Example:
+            Record Page Snapshot    inventory
+        """
+        html = SCRIPT_RE.sub('', self._builtin.run_keyword('Browser.Get Page Source'))
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshot_dir / f"{name}.html"
+        path.write_text(html, encoding='utf-8')
+        logger.info(f"Snapshot '{name}' saved to {path} ({len(html)} characters)")
+        return str(path)
+
+    @keyword
+    def page_snapshots_exist(self, *names):
+        """
+        Returns True when all named snapshots have been recorded.
+
+        Example:
+            ${recorded}=    Page Snapshots Exist    login    inventory
+        """
+        return all((self.snapshot_dir / f"{name}.html").exists() for name in names)
+
+    @keyword
+    def load_locators(self, *resource_files, exclude=None):
+        """
+        Returns the locator variables of resource files as a name to selector dictionary.
+
+        Arguments:
+            resource_files: Locator resource files
+            exclude: Comma separated variable name patterns to skip, e.g. prefixes completed at run time
+
+        Example:
+            &{locators}=    Load Locators    ${LOCATORS}/inventory_page.resource    exclude=*_PREFIX
+        """
+        skip = MultiMatcher([p.strip() for p in (exclude or '').split(',') if p.strip()], ignore='_')
+        locators = {}
+        for path in resource_files:
+            for variable in ResourceFileBuilder().build(path).variables:
+                name = variable.name[2:-1]
+                if not skip.match(name):
+                    locators[name] = self._builtin.replace_variables(' '.join(variable.value))
+        return locators
+
+    @keyword
+    def benchmark_locators(self, locators, *snapshots):
+        """
+        Resolves each locator repeatedly on each snapshot and records times and match counts.
+
+        Arguments:
+            locators: Dictionary of locator name to selector
+            snapshots: Snapshot names to load, in turn, into the current page
+
+        Example:
+            Benchmark Locators    ${locators}    login    inventory
+        """
+        specs = [{'name': name, 'selector': selector} for name, selector in locators.items()]
+        for snapshot in snapshots:
+            path = self.snapshot_dir / f"{snapshot}.html"
+            if not path.exists():
+                raise SkipExecution(f"No snapshot '{snapshot}' in {self.snapshot_dir}, record it with "
+                                    f"RECORD_SNAPSHOTS=True")
+            self._builtin.run_keyword('Browser.Go To', path.resolve().as_uri())
+            # A list, not JSON: run_keyword would resolve escapes and variables in a string again
+            outcome = json.loads(self._builtin.run_keyword('Browser.Benchmark Locators', specs, self.repeat))
+            baseline = median(outcome['baseline_ms'])
+            for result in outcome['locators']:
+                entry = self._results.setdefault(result['name'], {'selector': result['selector'], 'snapshots': {}})
+                entry['snapshots'][snapshot] = self._stats(result, baseline)
+
+    def _stats(self, result, baseline):
+        times = sorted(result['times_ms'])
+        if not times:
+            return {'error': result['error']}
+        return {
+            'median_ms': round(median(times), 3),
+            'p95_ms': round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+            'net_median_ms': round(max(0.0, median(times) - baseline), 3),
+            'matches': max(result['counts']),
+            'stable': len(set(result['counts'])) == 1,
+            'error': result['error'],
+        }
+
+    def _flags(self, selector, snapshots):
+        flags = set()
+        matched = [s for s in snapshots.values() if s.get('matches')]
+        if any(s.get('error') for s in snapshots.values()):
+            flags.add('error')
+        elif not matched:
+            flags.add('missing')
+        if any(s['matches'] > 1 for s in matched):
+            flags.add('strict')
+        if FUZZY_SELECTOR_RE.search(selector) or not all(s.get('stable', True) for s in snapshots.values()):
+            flags.add('ambiguous')
+        if any(s.get('net_median_ms', 0) >= self.slow_ms for s in snapshots.values()):
+            flags.add('slow')
+        return [flag for flag in FLAGS if flag in flags]
+
+    @keyword
+    def write_locator_report(self, path=None):
+        """
+        Writes the benchmarked locators ranked from slowest to fastest as JSON and logs them as a table.
+
+        ``strict`` means more than one match (actions fail in strict mode),
+        ``ambiguous`` text or substring matching or a match count changing
+        between runs, ``missing`` no match on any snapshot.
+
+        Arguments:
+            path: Report file (defaults to ${OUTPUT_DIR}/locator_report.json)
+
+        Example:
+            Write Locator Report
+        """
+        path = Path(path or Path(self._builtin.get_variable_value('${OUTPUT_DIR}')) / 'locator_report.json')
+        ranked = []
+        for name, entry in self._results.items():
+            slowest = max((s.get('net_median_ms', 0) for s in entry['snapshots'].values()), default=0)
+            ranked.append({'name': name, 'selector': entry['selector'], 'net_median_ms': slowest,
+                           'flags': self._flags(entry['selector'], entry['snapshots']),
+                           'snapshots': entry['snapshots']})
+        # Errors first, then the slowest
+        ranked.sort(key=lambda r: ('error' not in r['flags'], -r['net_median_ms']))
+        report = {'repeat': self.repeat, 'slow_ms': self.slow_ms, 'locators': ranked}
+        path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+        rows = []
+        for r in ranked:
+            matches = ', '.join(f"{snapshot}: {stats.get('matches', '-')}" for snapshot, stats in r['snapshots'].items())
+            rows.append(f"<tr><td>{escape(r['name'])}</td><td><code>{escape(r['selector'])}</code></td>"
+                        f"<td>{r['net_median_ms']} ms</td><td>{escape(matches)}</td><td>{', '.join(r['flags'])}</td></tr>")
+        logger.info(f"<table><tr><th>Locator</th><th>Selector</th><th>Net median</th><th>Matches</th>"
+                    f"<th>Flags</th></tr>{''.join(rows)}</table>", html=True)
+        flagged = [r for r in ranked if r['flags']]
+        logger.info(f"{len(ranked)} locator(s) benchmarked, {len(flagged)} flagged, report written to {path}")
+        return str(path)
@@ -8,12 +8,19 @@ Robot Framework library for enhanced logging, assertions and screenshots.
 import os
 import time
 import base64
-import pyautogui
 from datetime import datetime
 from robot.api import logger
 from robot.api.deco import keyword
 from robot.libraries.BuiltIn import BuiltIn
 
+try:
+    from lazy_import import lazy_import
+except ImportError:
+    from libraries.lazy_import import lazy_import
+
+# Slow to import and needs a display; only screenshots use it
+pyautogui = lazy_import('pyautogui')
+
 class LoggerLibrary:
     """
     Library providing enhanced logging with assertion capabilities for Robot Framework.
@@ -134,6 +141,7 @@ class LoggerLibrary:
         try:
             self._builtin.should_be_equal(actual, expected, message)
         except AssertionError as e:
+            self._request_failure_trace()
             if capture:
                 self.capture_and_embed_screenshot(f"assertion_failure_{int(time.time())}")
             raise e
@@ -157,6 +165,7 @@ class LoggerLibrary:
         try:
             self._builtin.should_contain(actual, expected, message)
         except AssertionError as e:
+            self._request_failure_trace()
             if capture:
                 self.capture_and_embed_screenshot(f"assertion_failure_{int(time.time())}")
             raise e
@@ -179,6 +188,7 @@ class LoggerLibrary:
         try:
             self._builtin.should_be_true(condition, message)
         except AssertionError as e:
+            self._request_failure_trace()
             if capture:
                 self.capture_and_embed_screenshot(f"assertion_failure_{int(time.time())}")
             raise e
@@ -196,8 +206,19 @@ class LoggerLibrary:
             Log And Fail    Critical error: Database connection lost
         """
         self.log_error(message)
+        self._request_failure_trace()
         
         if capture_screenshot:
             self.capture_and_embed_screenshot(f"failure_{int(time.time())}")
             
-        self._builtin.fail(message) 
\ No newline at end of file
+        self._builtin.fail(message)
+    
+    def _request_failure_trace(self):
+        """
+        Marks the current test so BrowserPool keeps its Playwright trace,
+        even if the failure is later caught by the caller.
+        """
+        try:
+            self._builtin.set_test_variable('${FAILURE_TRACE_REQUESTED}', True)
+        except Exception:
+            pass  # Not running inside a test
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Authenticated session cache for Robot Framework test automation.
+Persists Playwright storage state per user type so tests can skip the UI login.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+from typing import Optional
+from urllib.parse import urlparse
+from robot.api import logger
+from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn
+
+
+class SessionCache:
+    """
+    Library caching Playwright storage state (cookies, localStorage) on disk.
+
+    Entries are keyed by user type, TEST_ENV and application host (not the
+    port, which the local stand-in picks anew every run). An entry is only
+    handed out while it is younger than the TTL, parses as storage state and
+    still holds at least one unexpired cookie. Callers are expected to
+    invalidate an entry that the application rejects and fall back to the
+    UI login.
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self, cache_directory=None, ttl=None):
+        """
+        Initialize the SessionCache library.
+
+        Arguments:
+            cache_directory: Directory for cached states (defaults to SESSION_CACHE_DIR or .session_cache)
+            ttl: Maximum age of a cached state in seconds (defaults to SESSION_CACHE_TTL or 3600)
+        """
+        self._builtin = BuiltIn()
+        self._cache_dir = cache_directory or os.getenv('SESSION_CACHE_DIR', '.session_cache')
+        self._ttl = int(ttl if ttl is not None else os.getenv('SESSION_CACHE_TTL', '3600'))
+        self._enabled = os.getenv('SESSION_CACHE', 'True').lower() == 'true'
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    @keyword
+    def get_cached_storage_state(self, user_type: str, url: str) -> Optional[str]:
+        """
+        Returns the path of a valid cached storage state, or None.
+
+        Arguments:
+            user_type: Type of user (standard, locked, problem)
+            url: Application URL the state belongs to
+
+        Example:
+            ${state}=    Get Cached Storage State    standard    ${url}
+        """
+        if not self._enabled:
+            return None
+        path = self._state_path(user_type, url)
+        if not os.path.exists(path):
+            logger.info(f"No cached session for '{user_type}'")
+            return None
+        age = time.time() - os.path.getmtime(path)
+        if age > self._ttl:
+            logger.info(f"Cached session for '{user_type}' expired ({age:.0f}s > {self._ttl}s)")
+            self._remove(path)
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warn(f"Discarding unreadable cached session {path}: {e}")
+            self._remove(path)
+            return None
+        if not self._has_live_cookie(state):
+            logger.info(f"Cached session for '{user_type}' has no live cookies")
+            self._remove(path)
+            return None
+        logger.info(f"Using cached session for '{user_type}' ({age:.0f}s old)")
+        return os.path.abspath(path)
+
+    @keyword
+    def save_storage_state_for_user(self, user_type: str, url: str) -> str:
+        """
+        Saves the storage state of the current context for later tests.
+
+        Must be called after a successful login. Returns the cache file path.
+
+        Arguments:
+            user_type: Type of user the current context is logged in as
+            url: Application URL the state belongs to
+
+        Example:
+            Save Storage State For User    standard    ${url}
+        """
+        saved = self._builtin.run_keyword('Browser.Save Storage State')
+        path = self._state_path(user_type, url)
+        tmp_path = f"{path}.tmp"
+        shutil.copyfile(saved, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Cached session for '{user_type}' at {path}")
+        return os.path.abspath(path)
+
+    @keyword
+    def invalidate_storage_state(self, user_type: str, url: str) -> None:
+        """
+        Removes the cached storage state, e.g. when the application rejected it.
+
+        Arguments:
+            user_type: Type of user
+            url: Application URL the state belongs to
+
+        Example:
+            Invalidate Storage State    standard    ${url}
+        """
+        logger.info(f"Invalidating cached session for '{user_type}'")
+        self._remove(self._state_path(user_type, url))
+
+    def _state_path(self, user_type, url):
+        # Cookies are scoped by host, not port, so a state stays valid across stand-in restarts
+        environment = f"{os.getenv('TEST_ENV', 'staging')}|{urlparse(url).hostname or ''}"
+        digest = hashlib.sha1(environment.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self._cache_dir, f"{user_type}-{digest}.json")
+
+    def _has_live_cookie(self, state):
+        cookies = state.get('cookies', [])
+        now = time.time()
+        # Playwright uses -1 for session cookies
+        return any(c.get('expires', -1) == -1 or c.get('expires', 0) > now for c in cookies)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
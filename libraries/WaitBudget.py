@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Wait instrumentation and adaptive timeouts for element waits.
+
+Records how long each selector takes to reach its state into a SQLite
+store shared by all runs and workers, and can derive per-selector
+timeouts from that history.
+
+Usage:
+    python libraries/WaitBudget.py [--db .wait_stats.sqlite]
+"""
+
+import os
+import sys
+import time
+import atexit
+import sqlite3
+import threading
+from datetime import timedelta
+from typing import Dict, List, Optional
+from robot.api import logger
+from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import timestr_to_secs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS waits (
+    selector TEXT NOT NULL,
+    page TEXT NOT NULL,
+    state TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    success INTEGER NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waits_key ON waits (selector, page, state, recorded_at);
+"""
+
+
+class WaitStore:
+    """SQLite store of wait samples, buffered so waits do not pay for a commit each."""
+
+    def __init__(self, path: str, history: int = 200, flush_every: int = 25):
+        self.path = path
+        self.history = history
+        self._flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        # Parallel workers share the file; wait for their locks instead of failing
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, selector: str, page: str, state: str, elapsed: float, success: bool) -> None:
+        with self._lock:
+            self._buffer.append((selector, page, state, elapsed, int(success), time.time()))
+            if len(self._buffer) >= self._flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        with self._connect() as db:
+            db.executemany("INSERT INTO waits VALUES (?, ?, ?, ?, ?, ?)", self._buffer)
+        self._buffer = []
+
+    def percentiles(self, selector: str, page: str, state: str) -> Dict[str, float]:
+        """Percentiles (seconds) of the latest successful samples of one selector."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT elapsed FROM waits WHERE selector = ? AND page = ? AND state = ? AND success = 1 "
+                "ORDER BY recorded_at DESC LIMIT ?", (selector, page, state, self.history)).fetchall()
+        return summarize([row[0] for row in rows])
+
+    def all_keys(self) -> List[tuple]:
+        with self._connect() as db:
+            return db.execute("SELECT DISTINCT selector, page, state FROM waits ORDER BY page, selector").fetchall()
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))], 3)
+
+    return {'count': len(ordered), 'p50': pct(50), 'p90': pct(90), 'p99': pct(99), 'max': round(ordered[-1], 3)}
+
+
+class WaitBudget:
+    """
+    Library wrapping ``Wait For Elements State`` with timing and adaptive timeouts.
+
+    Every wait is recorded per selector, page and state. With
+    ``WAIT_TIMEOUT_MODE=adaptive`` a selector with enough history gets
+    ``p99 * WAIT_TIMEOUT_FACTOR`` as timeout, clamped between
+    ``WAIT_TIMEOUT_FLOOR`` and the timeout passed by the caller (or the
+    Browser library timeout from ``Set Browser Timeout``). Waits that will fail anyway then fail in
+    seconds instead of burning the full budget.
+    """
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self, database=None):
+        """
+        Initialize the WaitBudget library.
+
+        Arguments:
+            database: SQLite file for wait samples (defaults to WAIT_STATS_DB or .wait_stats.sqlite)
+        """
+        self._builtin = BuiltIn()
+        self._store = WaitStore(database or os.getenv('WAIT_STATS_DB', '.wait_stats.sqlite'))
+        self._adaptive = os.getenv('WAIT_TIMEOUT_MODE', 'fixed').lower() == 'adaptive'
+        self._floor = timestr_to_secs(os.getenv('WAIT_TIMEOUT_FLOOR', '2s'))
+        # Only used when the Browser library is not imported
+        self._ceiling = timestr_to_secs(os.getenv('WAIT_TIMEOUT_CEILING', '10s'))
+        self._factor = float(os.getenv('WAIT_TIMEOUT_FACTOR', '3'))
+        self._min_samples = int(os.getenv('WAIT_TIMEOUT_MIN_SAMPLES', '20'))
+        self._adaptive_cache = {}
+        atexit.register(self._store.flush)
+
+    @keyword
+    def timed_wait_for_elements_state(self, selector, state='visible', timeout=None, page='', message=None):
+        """
+        Waits for an element state and records how long it took.
+
+        Arguments:
+            selector: Element selector
+            state: Expected state (visible, attached, detached, ...)
+            timeout: Upper bound for the wait (defaults to the Browser library timeout)
+            page: Page name the selector belongs to, used to group statistics
+            message: Custom failure message
+
+        Example:
+            Timed Wait For Elements State    ${LOGIN_LOGO}    visible    page=login
+        """
+        effective = self.get_wait_timeout(selector, state, timeout, page)
+        args = [selector, state, timedelta(seconds=effective)]
+        if message:
+            args.append(f'message={message}')
+        started = time.perf_counter()
+        success = False
+        try:
+            self._builtin.run_keyword('Browser.Wait For Elements State', *args)
+            success = True
+        finally:
+            elapsed = time.perf_counter() - started
+            self._store.record(selector, page, state, elapsed, success)
+            logger.debug(f"Waited {elapsed:.3f}s of {effective:.1f}s for {selector} ({state}) on '{page}'")
+
+    @keyword
+    def get_wait_timeout(self, selector, state='visible', timeout=None, page='') -> float:
+        """
+        Returns the timeout in seconds a wait for the selector would use.
+
+        Arguments:
+            selector: Element selector
+            state: Expected state
+            timeout: Upper bound for the wait (defaults to the Browser library timeout)
+            page: Page name the selector belongs to
+
+        Example:
+            ${secs}=    Get Wait Timeout    ${INVENTORY_CONTAINER}    page=inventory
+        """
+        ceiling = timestr_to_secs(timeout) if timeout is not None else self._browser_timeout()
+        if not self._adaptive:
+            return ceiling
+        key = (selector, page, state)
+        if key not in self._adaptive_cache:
+            # History only changes between runs in a meaningful way; read it once
+            stats = self._store.percentiles(selector, page, state)
+            self._adaptive_cache[key] = stats['p99'] * self._factor if stats['count'] >= self._min_samples else None
+        adaptive = self._adaptive_cache[key]
+        if adaptive is None:
+            return ceiling
+        return min(ceiling, max(self._floor, adaptive))
+
+    def _browser_timeout(self) -> float:
+        """Current Browser library timeout in seconds, as waits without a timeout used before."""
+        try:
+            return self._builtin.get_library_instance('Browser').timeout / 1000
+        except RuntimeError:
+            return self._ceiling
+
+    @keyword
+    def get_wait_percentiles(self, selector, state='visible', page='') -> Dict[str, float]:
+        """
+        Returns count, p50, p90, p99 and max (seconds) of successful waits for a selector.
+
+        Example:
+            ${stats}=    Get Wait Percentiles    ${LOGIN_LOGO}    page=login
+        """
+        self._store.flush()
+        return self._store.percentiles(selector, page, state)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print recorded wait percentiles per selector.')
+    parser.add_argument('--db', default=os.getenv('WAIT_STATS_DB', '.wait_stats.sqlite'),
+                        help='SQLite file with wait samples (default: .wait_stats.sqlite)')
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"No wait statistics at {args.db}")
+        return 1
+    store = WaitStore(args.db)
+    print(f"{'page':<12}{'selector':<40}{'state':<10}{'count':>7}{'p50 s':>8}{'p90 s':>8}{'p99 s':>8}{'max s':>8}")
+    for selector, page, state in store.all_keys():
+        stats = store.percentiles(selector, page, state)
+        if stats['count']:
+            print(f"{page:<12}{selector[:39]:<40}{state:<10}{stats['count']:>7}{stats['p50']:>8}"
+                  f"{stats['p90']:>8}{stats['p99']:>8}{stats['max']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Deferred imports for heavy optional dependencies of the keyword libraries.
+
+``lazy_import('pyautogui')`` returns a module object whose code only runs
+on first attribute access, so importing a library does not pay for (or
+fail on) dependencies that only some keywords need. A missing module
+raises ImportError at first use instead of at library import.
+"""
+
+import sys
+import importlib.util
+from types import ModuleType
+
+
+class _MissingModule(ModuleType):
+    """Placeholder for a module that is not installed; fails when used."""
+
+    def __getattr__(self, attr):
+        raise ImportError(f"Module '{self.__name__}' is required for this keyword but is not installed")
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Returns the module ``name``, executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
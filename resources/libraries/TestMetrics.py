@@ -3,8 +3,11 @@
 
 import os
 import json
+import base64
+import hashlib
+import binascii
+import mimetypes
 import platform
-import psutil
 from datetime import datetime, timezone
 from robot.api import ExecutionResult, ResultVisitor
 import time
@@ -13,10 +16,21 @@ import traceback
 import re
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the calling script (generate_metrics, parallel_runner)
 logger = logging.getLogger(__name__)
 
+# Marker logged by BrowserPool with per-context request filter statistics
+REQUEST_FILTER_STATS_MARKER = 'REQUEST_FILTER_STATS'
+# Marker logged by BrowserPool with the output-relative path of a failure trace
+FAILURE_TRACE_MARKER = 'FAILURE_TRACE'
+# Marker logged by the KeywordProfiler listener with the sampled hot spots of one keyword call
+KEYWORD_PROFILE_MARKER = 'KEYWORD_PROFILE'
+# Inline payloads (embedded screenshots) are moved to side files instead of metrics.json
+DATA_URI_RE = re.compile(r'data:([\w.+-]+/[\w.+-]+);base64,([A-Za-z0-9+/=]+)')
+ATTACHMENTS_DIR = 'attachments'
+# First line FlakyRerun writes into the message of a test that needed reruns
+RERUN_RE = re.compile(r'^\[RERUN\] (flaky|failed) after (\d+) attempts')
+
 # --- Determine Absolute Path for Template (relative to this file) ---
 # _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # _TEMPLATE_PATH = os.path.join(_SCRIPT_DIR, 'templates', 'report_template.html')
@@ -32,8 +46,17 @@ class TestMetrics(ResultVisitor):
     
     ROBOT_LIBRARY_SCOPE = 'GLOBAL'
     
-    def __init__(self):
+    def __init__(self, attachment_dir=None, max_message_chars=None, max_test_message_chars=None):
+        """
+        Arguments:
+            attachment_dir: Directory for offloaded data: URIs and long messages (not written when None)
+            max_message_chars: Longer messages are truncated (defaults to METRICS_MAX_MESSAGE_CHARS or 4096)
+            max_test_message_chars: Message budget per test (defaults to METRICS_MAX_TEST_MESSAGE_CHARS or 65536)
+        """
         logger.debug("Initializing TestMetrics visitor instance.")
+        self.attachment_dir = attachment_dir
+        self.max_message_chars = int(max_message_chars or os.getenv('METRICS_MAX_MESSAGE_CHARS', '4096'))
+        self.max_test_message_chars = int(max_test_message_chars or os.getenv('METRICS_MAX_TEST_MESSAGE_CHARS', '65536'))
         self._reset_state()
 
     def _reset_state(self):
@@ -49,11 +72,18 @@ class TestMetrics(ResultVisitor):
                 'duration': 0.0, 'suites': [], 'tags': {},
                 'test_timeline': [], 'critical_failures': [],
                 'system_info': {}, # Populated at the end
-                'all_keywords': {}
+                'all_keywords': {},
+                'request_filter': {'blocked_requests': 0, 'stubbed_requests': 0, 'transferred_bytes': 0, 'tests': 0},
+                'keyword_profiles': {},
+                'attachments': {'files': 0, 'bytes': 0, 'references': 0, 'truncated_messages': 0},
+                'flakiness': {'passed': 0, 'flaky': 0, 'failed': 0, 'reruns': 0, 'flaky_rate': 0.0,
+                              'tests': {}, 'tags': {}}
             }
         self._suite_stack = [] 
         self._current_test_metrics = None
         self._keyword_stack = []
+        self._test_message_chars = 0
+        self._attachment_names = set()
         logger.debug("Internal metrics state reset.")
         
     def get_metrics(self):
@@ -70,6 +100,7 @@ class TestMetrics(ResultVisitor):
         """Gather system information."""
         logger.debug("Gathering system info...")
         try:
+            import psutil  # Deferred: only needed once per report, not per import
             uname = platform.uname()
             mem = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
@@ -173,12 +204,13 @@ class TestMetrics(ResultVisitor):
             'status': '', # Updated at end_test
             'tags': list(test.tags),
             'duration': 0.0, # Updated at end_test
-            'message': test.message or '',
+            'message': '', # Updated at end_test
             'start_time': str(test.starttime), # Store as string
             'end_time': str(test.endtime),   # Store as string
             'steps': []
         }
         self._keyword_stack = [] # Reset keyword stack for the new test
+        self._test_message_chars = 0
 
     def end_test(self, test):
         if not self._current_test_metrics or not self._suite_stack:
@@ -188,11 +220,18 @@ class TestMetrics(ResultVisitor):
         logger.debug(f"Ending test: {test.name} - Status: {test.status}")
         self._current_test_metrics['status'] = test.status
         self._current_test_metrics['duration'] = test.elapsedtime / 1000.0
-        self._current_test_metrics['message'] = test.message or ''
+        # The test's own message shares the per-test budget with its log messages
+        limit = min(self.max_message_chars, max(0, self.max_test_message_chars - self._test_message_chars))
+        text, attachments, truncated = self._compact_text(test.message or '', limit)
+        self._test_message_chars += len(text)
+        self._current_test_metrics['message'] = text
+        if attachments: self._current_test_metrics['message_attachments'] = attachments
+        if truncated: self._current_test_metrics['message_truncated'] = True
         parent_suite_metrics = self._suite_stack[-1]
         parent_suite_metrics['tests'].append(self._current_test_metrics)
         
         status = test.status
+        self._classify_rerun(test, parent_suite_metrics)
         # Aggregate Tag Stats
         for tag in list(test.tags):
             tag_stats = self.metrics['tags'].setdefault(tag, {'passed': 0, 'failed': 0, 'skipped': 0, 'total': 0})
@@ -212,18 +251,48 @@ class TestMetrics(ResultVisitor):
         })
         
         # Check for Critical Failures
-        if status == 'FAIL' and test.critical == 'yes':
+        # Robot Framework 4+ dropped criticality, every failed test counts
+        if status == 'FAIL':
              logger.warning(f"Critical failure detected in test: {test.name}")
              self.metrics['critical_failures'].append({
                   'test_name': test.name,
                   'suite_name': parent_suite_metrics['name'],
-                  'message': test.message or '',
-                  'timestamp': str(test.endtime)
+                  'message': self._current_test_metrics['message'],
+                  'timestamp': str(test.endtime),
+                  'trace': self._current_test_metrics.get('trace')
              })
              
         self._current_test_metrics = None # Clear context
         self._keyword_stack = [] # Clear keyword stack
 
+    def _classify_rerun(self, test, parent_suite_metrics):
+        """Classifies a test as passed, flaky or failed from the FlakyRerun message."""
+        if test.status not in ('PASS', 'FAIL'):
+            return
+        rerun = RERUN_RE.match(test.message or '')
+        if rerun:
+            outcome, attempts = rerun.group(1), int(rerun.group(2))
+        else:
+            outcome, attempts = ('passed' if test.status == 'PASS' else 'failed'), 1
+        self._current_test_metrics['outcome'] = outcome
+        self._current_test_metrics['attempts'] = attempts
+
+        flakiness = self.metrics['flakiness']
+        flakiness[outcome] += 1
+        flakiness['reruns'] += attempts - 1
+        runs = flakiness['passed'] + flakiness['flaky'] + flakiness['failed']
+        flakiness['flaky_rate'] = round(flakiness['flaky'] / runs * 100, 2)
+
+        # Per test (merged outputs may hold several runs of it) and per tag
+        groups = [flakiness['tests'].setdefault(f"{parent_suite_metrics['name']}.{test.name}", {})]
+        groups += [flakiness['tags'].setdefault(tag, {}) for tag in test.tags]
+        for stats in groups:
+            stats['runs'] = stats.get('runs', 0) + 1
+            stats['attempts'] = stats.get('attempts', 0) + attempts
+            stats['flaky'] = stats.get('flaky', 0) + (outcome == 'flaky')
+            stats['failed'] = stats.get('failed', 0) + (outcome == 'failed')
+            stats['flaky_rate'] = round(stats['flaky'] / stats['runs'] * 100, 2)
+
     def start_keyword(self, keyword):
          # Only track keywords if within a test context
          if not self._current_test_metrics:
@@ -273,18 +342,113 @@ class TestMetrics(ResultVisitor):
     # def log_message(self, msg): self.message(msg)
 
     def message(self, msg):
+        if msg.message.startswith(REQUEST_FILTER_STATS_MARKER):
+            self._add_request_filter_stats(msg.message[len(REQUEST_FILTER_STATS_MARKER):])
+        elif msg.message.startswith(KEYWORD_PROFILE_MARKER):
+            self._add_keyword_profile(msg.message[len(KEYWORD_PROFILE_MARKER):])
+        elif msg.message.startswith(FAILURE_TRACE_MARKER) and self._current_test_metrics:
+            self._current_test_metrics['trace'] = msg.message[len(FAILURE_TRACE_MARKER):].strip()
         # Add message to the currently executing keyword
         if self._keyword_stack:
             logger.debug(f"Adding message to step '{self._keyword_stack[-1]['name']}': [{msg.level}] {msg.message[:100]}...")
-            self._keyword_stack[-1]['messages'].append({
+            limit = min(self.max_message_chars, max(0, self.max_test_message_chars - self._test_message_chars))
+            text, attachments, truncated = self._compact_text(msg.message, limit)
+            self._test_message_chars += len(text)
+            entry = {
                 'level': msg.level,
                 'timestamp': str(msg.timestamp),
-                'text': msg.message,
+                'text': text,
                 'html': msg.html
-            })
+            }
+            if attachments: entry['attachments'] = attachments
+            if truncated: entry['truncated'] = True
+            self._keyword_stack[-1]['messages'].append(entry)
         # else: Message outside a keyword context, maybe log it separately? 
         #     logger.debug(f"Message outside keyword context: [{msg.level}] {msg.message}")
+
+    def start_message(self, msg):
+        # ResultVisitor dispatches log messages here, not to message()
+        self.message(msg)
             
+    def _add_request_filter_stats(self, payload):
+        """Adds request filter statistics logged by BrowserPool to the current test and totals."""
+        if not self._current_test_metrics:
+            return
+        try:
+            stats = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed request filter stats: {payload[:100]}")
+            return
+        totals = self.metrics['request_filter']
+        if 'request_filter' not in self._current_test_metrics:
+            totals['tests'] += 1
+        test_stats = self._current_test_metrics.setdefault('request_filter',
+            {'blocked_requests': 0, 'stubbed_requests': 0, 'transferred_bytes': 0, 'by_type': {}})
+        for key in ('blocked_requests', 'stubbed_requests', 'transferred_bytes'):
+            test_stats[key] += stats.get(key, 0)
+            totals[key] += stats.get(key, 0)
+        for res_type, count in stats.get('by_type', {}).items():
+            test_stats['by_type'][res_type] = test_stats['by_type'].get(res_type, 0) + count
+
+    def _offload(self, data: bytes, suffix: str) -> str:
+        """Stores a payload once under its content hash and returns its report-relative path."""
+        name = f"{hashlib.sha256(data).hexdigest()[:24]}{suffix}"
+        stats = self.metrics['attachments']
+        stats['references'] += 1
+        if name not in self._attachment_names:
+            self._attachment_names.add(name)
+            stats['files'] += 1
+            stats['bytes'] += len(data)
+            if self.attachment_dir:
+                os.makedirs(self.attachment_dir, exist_ok=True)
+                path = os.path.join(self.attachment_dir, name)
+                if not os.path.exists(path):
+                    with open(path, 'wb') as f:
+                        f.write(data)
+        return f"{ATTACHMENTS_DIR}/{name}"
+
+    def _compact_text(self, text, limit):
+        """Replaces data: URIs with side file references and truncates text over limit characters."""
+        attachments = []
+
+        def replace(match):
+            try:
+                data = base64.b64decode(match.group(2))
+            except (binascii.Error, ValueError):
+                return match.group(0)
+            reference = self._offload(data, mimetypes.guess_extension(match.group(1)) or '.bin')
+            attachments.append(reference)
+            return reference
+
+        if 'data:' in text:
+            text = DATA_URI_RE.sub(replace, text)
+        truncated = len(text) > limit
+        if truncated:
+            reference = self._offload(text.encode('utf-8'), '.txt')
+            attachments.append(reference)
+            text = f"{text[:limit]}... [truncated {len(text) - limit} chars, full text: {reference}]"
+            self.metrics['attachments']['truncated_messages'] += 1
+        return text, attachments, truncated
+
+    def _add_keyword_profile(self, payload):
+        """Merges one KEYWORD_PROFILE message into the per-keyword sampling summary."""
+        try:
+            call = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed keyword profile: {payload[:200]}")
+            return
+        profile = self.metrics['keyword_profiles'].setdefault(call['keyword'],
+            {'calls': 0, 'samples': 0, 'sampled_time': 0.0, 'top_functions': {}})
+        profile['calls'] += 1
+        profile['samples'] += call['samples']
+        # Older payloads only carry the sample count; estimate their time from the interval
+        sampled_time = call.get('sampled_time', call['samples'] * call['interval_ms'] / 1000.0)
+        profile['sampled_time'] = round(profile['sampled_time'] + sampled_time, 3)
+        functions = profile['top_functions']
+        for function, count in call.get('top', []):
+            functions[function] = functions.get(function, 0) + count
+        profile['top_functions'] = dict(sorted(functions.items(), key=lambda item: item[1], reverse=True)[:20])
+
     def close(self):
         # Added check to ensure final stats calculated if close is called explicitly
         logger.debug("ResultVisitor closing. Ensuring final stats calculated.")
@@ -369,11 +533,7 @@ if __name__ == '__main__':
          log_level = logging.DEBUG
     else:
          log_level = logging.INFO
-    logging.getLogger().setLevel(log_level) 
-    # Reconfigure root logger level if needed (optional, depends on setup)
-    # for handler in logging.root.handlers[:]:
-    #    logging.root.removeHandler(handler)
-    # logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
     
     logger.debug("Verbose logging enabled." if args.verbose else "Standard logging level.")
 
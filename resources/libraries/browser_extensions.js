@@ -0,0 +1,189 @@
+// Browser library JS extension: request filtering for lean page loads,
+// on-failure-only tracing, concurrent page branches and locator benchmarks.
+//
+// Loaded with `Library    Browser    jsextension=.../browser_extensions.js`.
+// Request filter profiles come from Config.get_browser_config()[request_filter].
+
+const STATS = new WeakMap();
+
+function emptyStats() {
+  return { blocked_requests: 0, stubbed_requests: 0, transferred_bytes: 0, by_type: {} };
+}
+
+async function applyRequestFilter(profile, context, logger) {
+  const filter = typeof profile === "string" ? JSON.parse(profile) : profile;
+  const blockTypes = new Set(filter.block_types || []);
+  const blockUrls = (filter.block_urls || []).map((pattern) => new RegExp(pattern));
+  const stubUrls = (filter.stub_urls || []).map((pattern) => new RegExp(pattern));
+  const stats = emptyStats();
+  STATS.set(context, stats);
+
+  await context.route("**/*", async (route) => {
+    const request = route.request();
+    const url = request.url();
+    const type = request.resourceType();
+    if (stubUrls.some((re) => re.test(url))) {
+      stats.stubbed_requests += 1;
+      stats.by_type[type] = (stats.by_type[type] || 0) + 1;
+      return route.fulfill({ status: 200, body: "" });
+    }
+    if (blockTypes.has(type) || blockUrls.some((re) => re.test(url))) {
+      stats.blocked_requests += 1;
+      stats.by_type[type] = (stats.by_type[type] || 0) + 1;
+      return route.abort("blockedbyclient");
+    }
+    return route.continue();
+  });
+  // Bytes that still went over the wire; compare with an unfiltered run for savings
+  context.on("requestfinished", async (request) => {
+    try {
+      const sizes = await request.sizes();
+      stats.transferred_bytes += sizes.responseHeadersSize + sizes.responseBodySize;
+    } catch (e) {
+      // Page or context already closed
+    }
+  });
+  logger(`Request filter applied: ${JSON.stringify(filter)}`);
+}
+applyRequestFilter.rfdoc = "Blocks or stubs requests of the active context according to a JSON profile.";
+
+async function getRequestFilterStats(context) {
+  return JSON.stringify(STATS.get(context) || emptyStats());
+}
+getRequestFilterStats.rfdoc = "Returns request filter statistics of the active context as JSON.";
+
+async function startFailureTrace(screenshots, context) {
+  // Playwright keeps the trace in its artifacts directory until stop()
+  await context.tracing.start({ screenshots: screenshots === true || screenshots === "True", snapshots: true });
+}
+startFailureTrace.rfdoc = "Starts tracing the active context without writing anything to disk yet.";
+
+async function stopFailureTrace(path, context) {
+  // Without a path the recorded trace is discarded
+  await context.tracing.stop(path ? { path } : {});
+}
+stopFailureTrace.rfdoc = "Stops tracing the active context, saving the trace only when a path is given.";
+
+class BranchAborted extends Error {}
+
+async function runBranchStep(page, step) {
+  const options = step.timeout_ms ? { timeout: step.timeout_ms } : {};
+  const locator = step.selector ? page.locator(step.selector) : null;
+  switch (step.action) {
+    case "goto":
+      return (await page.goto(step.value, options))?.status() ?? null;
+    case "wait":
+      await locator.waitFor({ state: step.state || "visible", ...options });
+      return null;
+    case "click":
+      await locator.click(options);
+      return null;
+    case "fill":
+      await locator.fill(step.value ?? "", options);
+      return null;
+    case "text":
+      return await locator.textContent(options);
+    case "count":
+      return await locator.count();
+    case "url":
+      return page.url();
+    case "title":
+      return await page.title();
+    default:
+      throw new Error(`Unknown branch step action '${step.action}'`);
+  }
+}
+
+async function runBranch(branch, context, state) {
+  const started = Date.now();
+  const result = { name: branch.name, status: "PASS", elapsed_ms: 0, steps: [], error: null };
+  let timer = null;
+  let page = null;
+  try {
+    page = await context.newPage();
+    state.pages.push(page);
+    const deadline = new Promise((_, reject) => {
+      timer = setTimeout(() => reject(new BranchAborted(`Branch timed out after ${branch.timeout_ms} ms`)),
+        branch.timeout_ms);
+    });
+    const steps = (async () => {
+      for (const step of branch.steps) {
+        if (state.cancelled) throw new BranchAborted("Cancelled after another branch failed");
+        const stepStarted = Date.now();
+        const value = await runBranchStep(page, step);
+        result.steps.push({ ...step, elapsed_ms: Date.now() - stepStarted, result: value });
+      }
+    })();
+    // The losing promise rejects once its page is closed; unhandled, that would kill the node process
+    steps.catch(() => {});
+    deadline.catch(() => {});
+    await Promise.race([steps, deadline]);
+  } catch (e) {
+    const cancelled = state.cancelled && !(e instanceof BranchAborted && e.message.startsWith("Branch timed"));
+    result.status = cancelled ? "CANCELLED" : "FAIL";
+    result.error = cancelled ? "Cancelled after another branch failed" : e.message;
+    if (!cancelled && state.cancelOnFailure) {
+      state.cancelled = true;
+      // Closing the other pages rejects whatever they are waiting for
+      await Promise.all(state.pages.filter((p) => p !== page).map((p) => p.close().catch(() => {})));
+    }
+  } finally {
+    clearTimeout(timer);
+    result.elapsed_ms = Date.now() - started;
+    if (page) await page.close().catch(() => {});
+  }
+  return result;
+}
+
+async function runConcurrentBranches(branches, cancelOnFailure, context, logger) {
+  // Branches normally arrive as a list; JSON strings are accepted for direct calls from Robot data
+  const specs = typeof branches === "string" ? JSON.parse(branches) : branches;
+  const state = { cancelled: false, cancelOnFailure: cancelOnFailure === true || cancelOnFailure === "True", pages: [] };
+  const started = Date.now();
+  const results = await Promise.all(specs.map((branch) => runBranch(branch, context, state)));
+  logger(`Ran ${specs.length} branch(es) concurrently in ${Date.now() - started} ms`);
+  return JSON.stringify({ elapsed_ms: Date.now() - started, branches: results });
+}
+runConcurrentBranches.rfdoc = "Runs JSON page branches concurrently, each on its own page of the active context.";
+
+function elapsedMs(start) {
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+async function benchmarkLocators(locators, repeat, page) {
+  // Locators normally arrive as a list; JSON strings are accepted for direct calls from Robot data
+  const specs = typeof locators === "string" ? JSON.parse(locators) : locators;
+  const runs = Number(repeat) || 20;
+  // Round trips of a no-op evaluate; subtracted in Python so times show the selector engine's share
+  const baseline = [];
+  for (let i = 0; i < runs; i++) {
+    const start = process.hrtime.bigint();
+    await page.evaluate(() => 0);
+    baseline.push(elapsedMs(start));
+  }
+  const results = [];
+  for (const spec of specs) {
+    const result = { name: spec.name, selector: spec.selector, times_ms: [], counts: [], error: null };
+    for (let i = 0; i < runs; i++) {
+      const start = process.hrtime.bigint();
+      try {
+        result.counts.push(await page.locator(spec.selector).count());
+      } catch (e) {
+        result.error = String(e.message || e).split("\n")[0];
+        break;
+      }
+      result.times_ms.push(elapsedMs(start));
+    }
+    results.push(result);
+  }
+  return JSON.stringify({ baseline_ms: baseline, locators: results });
+}
+benchmarkLocators.rfdoc = "Resolves JSON locators repeatedly on the current page, returning times and match counts as JSON.";
+
+exports.__esModule = true;
+exports.applyRequestFilter = applyRequestFilter;
+exports.getRequestFilterStats = getRequestFilterStats;
+exports.startFailureTrace = startFailureTrace;
+exports.stopFailureTrace = stopFailureTrace;
+exports.runConcurrentBranches = runConcurrentBranches;
+exports.benchmarkLocators = benchmarkLocators;
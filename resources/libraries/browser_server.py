@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent browser server shared across robot invocations.
+
+A local daemon keeps Browser library node processes (the gRPC Playwright
+wrapper every robot process otherwise starts) and launched browsers warm
+between runs. A client leases one wrapper for itself, passed to robot as
+ROBOT_FRAMEWORK_BROWSER_NODE_PORT, plus the endpoint of a shared browser
+server which BrowserPool connects to instead of launching a browser. Every
+client has its own wrapper and browser connection, so contexts never mix.
+The daemon caps concurrent clients, health-checks and restarts its
+processes, recycles wrappers of crashed or vanished clients, restarts
+shared browsers after a number of leases or above a memory limit and
+exits after an idle timeout.
+
+Usage:
+    python3 resources/libraries/browser_server.py start [--max-clients 4] [--idle-timeout 15m]
+    python3 resources/libraries/browser_server.py run -- robot -d results tests/e2e
+    python3 resources/libraries/browser_server.py status
+    python3 resources/libraries/browser_server.py stop
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+import psutil
+from robot.utils import timestr_to_secs
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8270
+LAUNCHER_SCRIPT = Path(__file__).resolve().parent / 'browser_server_launcher.js'
+NODE_PORT_ENV = 'ROBOT_FRAMEWORK_BROWSER_NODE_PORT'
+ENDPOINTS_ENV = 'BROWSER_SERVER_ENDPOINTS'
+HEALTH_INTERVAL_SEC = 5
+STARTUP_TIMEOUT_SEC = 30
+
+
+def server_url() -> str:
+    return os.getenv('BROWSER_SERVER_URL', f"http://127.0.0.1:{os.getenv('BROWSER_SERVER_PORT', DEFAULT_PORT)}")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _port_open(port: int, host: str = '127.0.0.1') -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _tree_memory_mb(pid: int) -> float:
+    """RSS of a process and all its children (browser processes) in MB."""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0.0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+def _wrapper_dir() -> Path:
+    spec = importlib.util.find_spec('Browser')
+    if spec is None or not spec.origin:
+        raise RuntimeError("robotframework-browser is not installed")
+    wrapper = Path(spec.origin).parent / 'wrapper'
+    if not (wrapper / 'node_modules').exists():
+        raise RuntimeError(f"No node dependencies in {wrapper}, run 'rfbrowser init' first")
+    return wrapper
+
+
+# --- Daemon ---
+
+class NodeWrapper:
+    """One Browser library gRPC node process, leased to a single client at a time."""
+
+    def __init__(self, wrapper_dir: Path, log_dir: Path):
+        self.port = _free_port()
+        self.uses = 0
+        self.lease = None
+        self._log = open(log_dir / f"playwright-log-{self.port}.txt", 'w', encoding='utf-8')
+        # Same command line as the Browser library uses for its own process
+        self.process = subprocess.Popen(['node', str(wrapper_dir / 'index.js'), str(self.port)], cwd=wrapper_dir,
+                                        stdout=self._log, stderr=subprocess.STDOUT)
+
+    def wait_ready(self, timeout: float = STARTUP_TIMEOUT_SEC) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline and self.alive():
+            if _port_open(self.port):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+
+
+class BrowserLauncher:
+    """Node process holding the shared Playwright browser servers."""
+
+    def __init__(self, wrapper_dir: Path):
+        env = dict(os.environ, NODE_PATH=str(wrapper_dir / 'node_modules'))
+        self.process = subprocess.Popen(['node', str(LAUNCHER_SCRIPT)], env=env, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, text=True)
+        self._lock = threading.Lock()
+
+    def command(self, **command) -> dict:
+        with self._lock:
+            self.process.stdin.write(json.dumps(command) + '\n')
+            self.process.stdin.flush()
+            reply = json.loads(self.process.stdout.readline() or '{"ok": false, "error": "launcher exited"}')
+        if not reply.pop('ok'):
+            raise RuntimeError(reply['error'])
+        return reply
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self):
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class BrowserDaemon:
+    """Pool of node wrappers and shared browsers with client leases."""
+
+    def __init__(self, max_clients: int, warm: int, idle_timeout: float, max_uses: int, log_dir: Path,
+                 browser_max_uses: int = 0, browser_max_memory_mb: int = 0):
+        self.max_clients = max_clients
+        self.warm = min(warm, max_clients)
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.browser_max_uses = browser_max_uses
+        self.browser_max_memory_mb = browser_max_memory_mb
+        self.log_dir = log_dir
+        self.started = time.time()
+        self.last_activity = time.time()
+        self.leases = {}  # lease id -> {'pid', 'client', 'wrapper', 'since', 'endpoint'}
+        self._browser_uses = {}  # browser key -> leases since the browser was launched
+        self.stopping = threading.Event()
+        self._wrapper_dir = _wrapper_dir()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._launcher = BrowserLauncher(self._wrapper_dir)
+        self._fill_warm_pool()
+
+    def _fill_warm_pool(self):
+        while len(self._idle) < self.warm and len(self._idle) + len(self.leases) < self.max_clients:
+            wrapper = NodeWrapper(self._wrapper_dir, self.log_dir)
+            if wrapper.wait_ready():
+                self._idle.append(wrapper)
+            else:
+                logger.error(f"Node wrapper on port {wrapper.port} did not start, see its playwright-log")
+                wrapper.stop()
+                return
+
+    def lease(self, pid: int, client: str, browser: str, headless: bool) -> Optional[dict]:
+        """Returns a lease, or None when max_clients clients are connected."""
+        with self._lock:
+            self.last_activity = time.time()
+            if len(self.leases) >= self.max_clients:
+                return None
+            wrapper = self._idle.pop() if self._idle else NodeWrapper(self._wrapper_dir, self.log_dir)
+            lease_id = uuid.uuid4().hex
+            self.leases[lease_id] = {'pid': pid, 'client': client, 'wrapper': wrapper, 'since': time.time()}
+        if not wrapper.wait_ready():
+            self.release(lease_id, recycle=True)
+            raise RuntimeError(f"Node wrapper on port {wrapper.port} did not start")
+        try:
+            endpoint = self._launcher.command(cmd='launch', browser=browser, headless=headless)
+        except RuntimeError:
+            self.release(lease_id)
+            raise
+        wrapper.uses += 1
+        wrapper.lease = lease_id
+        with self._lock:
+            if lease_id in self.leases:
+                self.leases[lease_id]['endpoint'] = endpoint['ws_endpoint']
+            self._browser_uses[endpoint['key']] = self._browser_uses.get(endpoint['key'], 0) + 1
+        logger.info(f"Leased wrapper :{wrapper.port} and {endpoint['key']} to {client} (pid {pid})")
+        return {'lease_id': lease_id, 'node_port': wrapper.port,
+                'endpoints': {endpoint['key']: endpoint['ws_endpoint']}}
+
+    def release(self, lease_id: str, recycle: bool = False) -> bool:
+        with self._lock:
+            lease = self.leases.pop(lease_id, None)
+            self.last_activity = time.time()
+        if not lease:
+            return False
+        wrapper = lease['wrapper']
+        wrapper.lease = None
+        # A crashed client may leave browsers, contexts or pages behind in its wrapper
+        if recycle or wrapper.uses >= self.max_uses or not wrapper.alive():
+            wrapper.stop()
+        else:
+            with self._lock:
+                self._idle.append(wrapper)
+        logger.info(f"Released wrapper :{wrapper.port} of {lease['client']}{' (recycled)' if recycle else ''}")
+        return True
+
+    def health(self) -> dict:
+        with self._lock:
+            wrappers = [{'port': w.port, 'leased': bool(w.lease), 'uses': w.uses, 'alive': w.alive()}
+                        for w in self._idle + [lease['wrapper'] for lease in self.leases.values()]]
+            clients = [{'client': lease['client'], 'pid': lease['pid'], 'node_port': lease['wrapper'].port,
+                        'seconds': round(time.time() - lease['since'], 1)} for lease in self.leases.values()]
+        status = self._browser_status()
+        browsers = {key: {'ws_endpoint': info['ws_endpoint'], 'pid': info['pid'],
+                          'memory_mb': round(_tree_memory_mb(info['pid']), 1),
+                          'uses': self._browser_uses.get(key, 0)}
+                    for key, info in status['servers'].items()}
+        retired = {ws: round(_tree_memory_mb(pid), 1) for ws, pid in status['retired'].items()}
+        healthy = self._launcher.alive() and all(w['alive'] for w in wrappers) and all(
+            _port_open(urlparse(b['ws_endpoint']).port) for b in browsers.values())
+        return {'status': 'ok' if healthy else 'degraded', 'pid': os.getpid(),
+                'uptime_sec': round(time.time() - self.started), 'idle_sec': round(time.time() - self.last_activity),
+                'max_clients': self.max_clients, 'clients': clients, 'wrappers': wrappers, 'browsers': browsers,
+                'retired_browsers_memory_mb': retired}
+
+    def _browser_status(self) -> dict:
+        if self._launcher.alive():
+            try:
+                return self._launcher.command(cmd='status')
+            except RuntimeError as e:
+                logger.warning(f"Launcher status failed: {e}")
+        return {'servers': {}, 'retired': {}}
+
+    def _recycle_browsers(self):
+        """
+        Retires shared browsers past their lease or memory limit and closes retired ones once unused.
+
+        Clients connected to a retired browser keep it until they release
+        their lease; the next lease launches a fresh browser.
+        """
+        status = self._browser_status()
+        retired = set(status['retired'])
+        for key, info in status['servers'].items():
+            uses = self._browser_uses.get(key, 0)
+            memory_mb = _tree_memory_mb(info['pid'])
+            if self.browser_max_uses and uses >= self.browser_max_uses:
+                reason = f"after {uses} lease(s)"
+            elif self.browser_max_memory_mb and memory_mb > self.browser_max_memory_mb:
+                reason = f"memory {memory_mb:.0f} MB > {self.browser_max_memory_mb} MB"
+            else:
+                continue
+            logger.info(f"Restarting shared browser {key} {reason}")
+            try:
+                self._launcher.command(cmd='retire', key=key)
+            except RuntimeError as e:
+                logger.warning(f"Could not retire browser {key}: {e}")
+                continue
+            self._browser_uses[key] = 0
+            retired.add(info['ws_endpoint'])
+        with self._lock:
+            in_use = {lease.get('endpoint') for lease in self.leases.values()}
+        if None in in_use:
+            return  # A lease is still being handed out; its endpoint may be one just retired
+        for ws_endpoint in retired - in_use:
+            try:
+                self._launcher.command(cmd='close_retired', ws_endpoint=ws_endpoint)
+            except RuntimeError as e:
+                logger.warning(f"Could not close retired browser {ws_endpoint}: {e}")
+
+    def maintain(self):
+        """Reaps leases of dead clients, replaces dead processes and stops when idle."""
+        while not self.stopping.wait(HEALTH_INTERVAL_SEC):
+            for lease_id, lease in list(self.leases.items()):
+                if not _pid_alive(lease['pid']):
+                    logger.warning(f"Client {lease['client']} (pid {lease['pid']}) is gone, reclaiming its lease")
+                    self.release(lease_id, recycle=True)
+            with self._lock:
+                dead = [w for w in self._idle if not w.alive()]
+                self._idle = [w for w in self._idle if w.alive()]
+            for wrapper in dead:
+                logger.warning(f"Idle node wrapper :{wrapper.port} died, replacing it")
+                wrapper.stop()
+            if not self._launcher.alive():
+                logger.warning("Browser launcher died, restarting it")
+                self._launcher = BrowserLauncher(self._wrapper_dir)
+                self._browser_uses = {}
+            self._recycle_browsers()
+            with self._lock:
+                self._fill_warm_pool()
+            if not self.leases and time.time() - self.last_activity > self.idle_timeout:
+                logger.info(f"No clients for {self.idle_timeout:.0f}s, shutting down")
+                self.stopping.set()
+
+    def stop(self):
+        self.stopping.set()
+        for lease_id in list(self.leases):
+            self.release(lease_id, recycle=True)
+        for wrapper in self._idle:
+            wrapper.stop()
+        self._idle = []
+        self._launcher.stop()
+
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    daemon: BrowserDaemon = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, self.daemon.health())
+        else:
+            self._reply(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        try:
+            if self.path == '/lease':
+                lease = self.daemon.lease(int(payload['pid']), payload.get('client', 'robot'),
+                                          payload.get('browser', 'chromium'), bool(payload.get('headless', True)))
+                if lease is None:
+                    self._reply(429, {'error': f"{self.daemon.max_clients} client(s) already connected"})
+                else:
+                    self._reply(200, lease)
+            elif self.path == '/release':
+                self._reply(200, {'released': self.daemon.release(payload['lease_id'],
+                                                                  bool(payload.get('recycle')))})
+            elif self.path == '/shutdown':
+                self._reply(200, {'stopping': True})
+                self.daemon.stopping.set()
+            else:
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+        except (KeyError, ValueError, RuntimeError) as e:
+            self._reply(500, {'error': str(e)})
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def serve(args) -> int:
+    try:
+        daemon = BrowserDaemon(args.max_clients, args.warm, timestr_to_secs(args.idle_timeout), args.max_uses,
+                               args.log_dir, args.browser_max_uses, args.browser_max_memory_mb)
+    except RuntimeError as e:
+        logger.error(f"Cannot start the browser server: {e}")
+        return 1
+    handler = type('ControlHandler', (_ControlHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=daemon.maintain, daemon=True).start()
+    logger.info(f"Browser server listening on http://127.0.0.1:{args.port} (max {args.max_clients} client(s))")
+    try:
+        daemon.stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    daemon.stop()
+    return 0
+
+
+# --- Client ---
+
+def _call(url: str, path: str, payload: Optional[dict] = None, timeout: float = 60) -> tuple[int, dict]:
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url + path, data=data, method='POST' if data is not None else 'GET',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+def is_running(url: Optional[str] = None) -> bool:
+    try:
+        return _call(url or server_url(), '/health', timeout=5)[0] == 200
+    except OSError:
+        return False
+
+
+def acquire(browser: str, headless: bool, pid: int, client: str, wait: float = 60,
+            url: Optional[str] = None) -> Optional[dict]:
+    """
+    Leases a node wrapper and a browser endpoint for the process ``pid``.
+
+    Waits up to ``wait`` seconds for a free client slot. Returns None when
+    the server is not running or stays full; callers then start their own.
+    """
+    url = url or server_url()
+    deadline = time.time() + wait
+    while True:
+        try:
+            status, body = _call(url, '/lease', {'pid': pid, 'client': client, 'browser': browser,
+                                                 'headless': headless})
+        except OSError:
+            return None
+        if status == 200:
+            return body
+        if status != 429 or time.time() > deadline:
+            logger.warning(f"No browser server lease: {body.get('error', status)}")
+            return None
+        time.sleep(0.5)
+
+
+def release(lease: dict, recycle: bool = False, url: Optional[str] = None):
+    try:
+        _call(url or server_url(), '/release', {'lease_id': lease['lease_id'], 'recycle': recycle})
+    except OSError as e:
+        logger.warning(f"Could not release browser server lease: {e}")
+
+
+def lease_environment(lease: dict) -> dict:
+    """Environment variables pointing a robot process at its lease."""
+    return {NODE_PORT_ENV: str(lease['node_port']), ENDPOINTS_ENV: json.dumps(lease['endpoints'])}
+
+
+def start_daemon(args) -> bool:
+    url = f"http://127.0.0.1:{args.port}"
+    if is_running(url):
+        logger.info(f"Browser server already running at {url}")
+        return True
+    args.log_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, os.path.abspath(__file__), 'serve', '--port', str(args.port),
+           '--max-clients', str(args.max_clients), '--warm', str(args.warm), '--idle-timeout', args.idle_timeout,
+           '--max-uses', str(args.max_uses), '--browser-max-uses', str(args.browser_max_uses),
+           '--browser-max-memory-mb', str(args.browser_max_memory_mb), '--log-dir', str(args.log_dir)]
+    with open(args.log_dir / 'browser-server.log', 'a', encoding='utf-8') as log:
+        process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   start_new_session=True)
+    deadline = time.time() + STARTUP_TIMEOUT_SEC
+    while time.time() < deadline and process.poll() is None:
+        if is_running(url):
+            logger.info(f"Browser server started at {url}")
+            return True
+        time.sleep(0.2)
+    logger.error(f"Browser server did not come up, see {args.log_dir / 'browser-server.log'}")
+    return False
+
+
+def run_command(args) -> int:
+    """Runs a command (usually robot) with a leased wrapper and browser, starting the daemon if needed."""
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        logger.error("No command given, e.g. run -- robot tests/e2e")
+        return 2
+    env = dict(os.environ)
+    url = f"http://127.0.0.1:{args.port}"
+    lease = None
+    if is_running(url) or (not args.no_start and start_daemon(args)):
+        lease = acquire(os.getenv('BROWSER', 'chromium'), os.getenv('HEADLESS', 'True').lower() == 'true',
+                        os.getpid(), ' '.join(command)[:80], url=url)
+    if lease:
+        env.update(lease_environment(lease))
+    else:
+        logger.warning("Running without the browser server")
+    rc = subprocess.call(command, env=env)
+    if lease:
+        # Robot return codes above 250 mean the run broke; do not hand its wrapper to the next client
+        release(lease, recycle=rc > 250 or rc < 0, url=url)
+    return rc
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep Browser library node processes and browsers warm across runs.')
+    sub = parser.add_subparsers(dest='action', required=True)
+    for name in ('start', 'serve', 'run'):
+        p = sub.add_parser(name)
+        p.add_argument('--port', type=int, default=int(os.getenv('BROWSER_SERVER_PORT', DEFAULT_PORT)),
+                       help=f'Control port (default: BROWSER_SERVER_PORT or {DEFAULT_PORT})')
+        p.add_argument('--max-clients', type=int, default=int(os.getenv('BROWSER_SERVER_MAX_CLIENTS', '4')),
+                       help='Concurrent clients (default: BROWSER_SERVER_MAX_CLIENTS or 4)')
+        p.add_argument('--warm', type=int, default=1, help='Idle node wrappers kept ready (default: 1)')
+        p.add_argument('--idle-timeout', default=os.getenv('BROWSER_SERVER_IDLE_TIMEOUT', '15m'),
+                       help='Shut down after this long without clients (default: BROWSER_SERVER_IDLE_TIMEOUT or 15m)')
+        p.add_argument('--max-uses', type=int, default=20, help='Leases per node wrapper before it is replaced (default: 20)')
+        p.add_argument('--browser-max-uses', type=int,
+                       default=int(os.getenv('BROWSER_SERVER_BROWSER_MAX_USES', '100')),
+                       help='Leases per shared browser before it is restarted, 0 disables '
+                            '(default: BROWSER_SERVER_BROWSER_MAX_USES or 100)')
+        p.add_argument('--browser-max-memory-mb', type=int,
+                       default=int(os.getenv('BROWSER_SERVER_BROWSER_MAX_MEMORY_MB', '2048')),
+                       help='RSS of a shared browser process tree above which it is restarted, 0 disables '
+                            '(default: BROWSER_SERVER_BROWSER_MAX_MEMORY_MB or 2048)')
+        p.add_argument('--log-dir', type=Path, default=Path('.browser_server'), help='Log directory (default: .browser_server)')
+    sub.choices['run'].add_argument('--no-start', action='store_true', help='Do not start the daemon if it is not running')
+    sub.choices['run'].add_argument('command', nargs=argparse.REMAINDER, help='Command to run after --')
+    for name in ('status', 'stop'):
+        sub.add_parser(name).add_argument('--port', type=int, default=int(os.getenv('BROWSER_SERVER_PORT', DEFAULT_PORT)))
+    args = parser.parse_args()
+    url = f"http://127.0.0.1:{args.port}"
+
+    if args.action == 'serve':
+        return serve(args)
+    if args.action == 'start':
+        return 0 if start_daemon(args) else 1
+    if args.action == 'run':
+        return run_command(args)
+    if not is_running(url):
+        logger.info(f"No browser server running at {url}")
+        return 1 if args.action == 'status' else 0
+    if args.action == 'status':
+        print(json.dumps(_call(url, '/health')[1], indent=2))
+        return 0
+    _call(url, '/shutdown', {})
+    logger.info("Browser server stopping")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
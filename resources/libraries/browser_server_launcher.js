@@ -0,0 +1,88 @@
+// Browser server launcher for browser_server.py: keeps Playwright browser
+// servers running so robot processes can connect to warm browsers.
+//
+// Reads one JSON command per stdin line and answers with one JSON line.
+// playwright-core is resolved through NODE_PATH (the Browser library's
+// wrapper node_modules). A retired browser stays up for the clients still
+// connected to it while the next launch starts a fresh one. Closing stdin
+// closes all browsers.
+
+const readline = require("readline");
+const playwright = require("playwright-core");
+
+const servers = new Map(); // key -> current browser server
+const retired = new Map(); // ws endpoint -> replaced browser server
+
+function describe(server) {
+  return { ws_endpoint: server.wsEndpoint(), pid: server.process().pid };
+}
+
+async function launch(browser, headless) {
+  const key = `${browser}:${headless ? "headless" : "headed"}`;
+  if (!servers.has(key)) {
+    const server = await playwright[browser].launchServer({ headless });
+    const wsEndpoint = server.wsEndpoint();
+    server.on("close", () => {
+      if (servers.get(key) === server) servers.delete(key);
+      retired.delete(wsEndpoint);
+    });
+    servers.set(key, server);
+  }
+  return { key, ...describe(servers.get(key)) };
+}
+
+function retire(key) {
+  const server = servers.get(key);
+  if (!server) return { ws_endpoint: null };
+  servers.delete(key);
+  retired.set(server.wsEndpoint(), server);
+  return { ws_endpoint: server.wsEndpoint() };
+}
+
+async function closeRetired(wsEndpoint) {
+  const server = retired.get(wsEndpoint);
+  retired.delete(wsEndpoint);
+  if (server) await server.close().catch(() => {});
+  return {};
+}
+
+async function handle(command) {
+  if (command.cmd === "launch") {
+    return launch(command.browser, command.headless);
+  }
+  if (command.cmd === "status") {
+    return {
+      servers: Object.fromEntries([...servers].map(([key, server]) => [key, describe(server)])),
+      retired: Object.fromEntries([...retired].map(([ws, server]) => [ws, server.process().pid])),
+    };
+  }
+  if (command.cmd === "retire") {
+    return retire(command.key);
+  }
+  if (command.cmd === "close_retired") {
+    return closeRetired(command.ws_endpoint);
+  }
+  if (command.cmd === "close") {
+    const all = [...servers.values(), ...retired.values()];
+    await Promise.all(all.map((server) => server.close().catch(() => {})));
+    servers.clear();
+    retired.clear();
+    return {};
+  }
+  throw new Error(`Unknown command '${command.cmd}'`);
+}
+
+const lines = readline.createInterface({ input: process.stdin });
+lines.on("line", async (line) => {
+  let reply;
+  try {
+    reply = { ok: true, ...(await handle(JSON.parse(line))) };
+  } catch (e) {
+    reply = { ok: false, error: String(e.message || e).split("\n")[0] };
+  }
+  process.stdout.write(JSON.stringify(reply) + "\n");
+});
+lines.on("close", async () => {
+  await handle({ cmd: "close" });
+  process.exit(0);
+});
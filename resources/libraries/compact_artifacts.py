@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Results artifact compaction and retention.
+
+Compresses text logs (``playwright-log.txt`` and friends) in place to
+``.gz``, moves binary artifacts (screenshots, traces, HAR files) into a
+content-addressed store shared by all run directories and replaces them
+with relative symlinks, so log.html/report.html keep resolving them.
+A manifest in the store indexes every run; retention removes whole runs
+by age or total size and garbage-collects unreferenced objects.
+
+Usage:
+    python3 resources/libraries/compact_artifacts.py compact results res/1 res/2 res/4 [--store .artifacts]
+    python3 resources/libraries/compact_artifacts.py retain --max-age-days 30 --max-size-mb 500
+    python3 resources/libraries/compact_artifacts.py restore results
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import IO
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE = Path('.artifacts')
+MANIFEST = 'manifest.json'
+TEXT_SUFFIXES = {'.txt', '.log'}
+BINARY_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webm', '.zip', '.har'}
+
+
+def open_artifact(path, mode: str = 'r') -> IO:
+    """
+    Opens an artifact whether or not it has been compacted.
+
+    Falls back to ``<path>.gz`` when the plain file is gone; symlinked
+    binaries resolve through the filesystem.
+    """
+    path = Path(path)
+    if not path.exists() and path.with_name(path.name + '.gz').exists():
+        gz_mode = 'rt' if 'b' not in mode else 'rb'
+        return gzip.open(path.with_name(path.name + '.gz'), gz_mode, encoding=None if 'b' in mode else 'utf-8',
+                         errors=None if 'b' in mode else 'replace')
+    if 'b' in mode:
+        return open(path, mode)
+    return open(path, mode, encoding='utf-8', errors='replace')
+
+
+class ArtifactStore:
+    """Content-addressed object store with a manifest of compacted runs."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects = root / 'objects'
+        self.manifest_path = root / MANIFEST
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        else:
+            self.manifest = {'objects': {}, 'runs': {}}
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+
+    def object_path(self, digest: str, suffix: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}{suffix}"
+
+    def add(self, file_path: Path) -> tuple[str, Path]:
+        """Moves a file into the store (deduplicated) and returns its digest and object path."""
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        suffix = file_path.suffix.lower()
+        target = self.object_path(digest, suffix)
+        if target.exists():
+            file_path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(file_path), target)
+        self.manifest['objects'][digest] = {'suffix': suffix, 'size': target.stat().st_size}
+        return digest, target
+
+
+def compact_run(store: ArtifactStore, run_dir: Path) -> dict:
+    """Compacts one run directory and records it in the manifest."""
+    run_key = str(run_dir.resolve())
+    run = store.manifest['runs'].setdefault(run_key, {'files': {}, 'compressed': []})
+    # Age of the run itself, taken before compaction rewrites its files; compacting again keeps it
+    files = [p for p in run_dir.rglob('*') if p.is_file() and not p.is_symlink()]
+    newest = max((p.stat().st_mtime for p in files), default=None)
+    saved = 0
+    for path in sorted(run_dir.rglob('*')):
+        if path.is_symlink() or not path.is_file():
+            continue
+        suffix = path.suffix.lower()
+        relative = str(path.relative_to(run_dir))
+        if suffix in TEXT_SUFFIXES:
+            size = path.stat().st_size
+            with open(path, 'rb') as source, gzip.open(f"{path}.gz", 'wb', compresslevel=9) as target:
+                shutil.copyfileobj(source, target)
+            shutil.copystat(path, f"{path}.gz")
+            path.unlink()
+            saved += size - Path(f"{path}.gz").stat().st_size
+            if relative not in run['compressed']:
+                run['compressed'].append(relative)
+        elif suffix in BINARY_SUFFIXES:
+            size = path.stat().st_size
+            known = len(store.manifest['objects'])
+            digest, target = store.add(path)
+            if len(store.manifest['objects']) == known:
+                saved += size  # Duplicate of an object already in the store
+            path.symlink_to(os.path.relpath(target, path.parent))
+            run['files'][relative] = digest
+    run['compacted_at'] = time.time()
+    run['mtime'] = run.get('mtime') or newest or run['compacted_at']
+    logger.info(f"Compacted {run_dir}: {len(run['files'])} object link(s), "
+                f"{len(run['compressed'])} compressed log(s), {saved / 1024:.1f} KB saved")
+    return run
+
+
+def restore_run(store: ArtifactStore, run_dir: Path) -> None:
+    """Turns symlinks back into real files and decompresses logs, e.g. before uploading."""
+    run = store.manifest['runs'].get(str(run_dir.resolve()))
+    if not run:
+        logger.warning(f"{run_dir} is not in the manifest")
+        return
+    for relative, digest in run['files'].items():
+        path = run_dir / relative
+        if path.is_symlink():
+            path.unlink()
+            shutil.copyfile(store.object_path(digest, store.manifest['objects'][digest]['suffix']), path)
+    for relative in run['compressed']:
+        path = run_dir / relative
+        with gzip.open(f"{path}.gz", 'rb') as source, open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(f"{path}.gz")
+    del store.manifest['runs'][str(run_dir.resolve())]
+    logger.info(f"Restored {run_dir}")
+
+
+def _run_size(run_dir: Path) -> int:
+    return sum(p.stat().st_size for p in run_dir.rglob('*') if p.is_file() and not p.is_symlink())
+
+
+def _runs_size(store: ArtifactStore, run_keys: list[str]) -> int:
+    """Bytes used by the given runs: their own files plus every object they reference."""
+    digests = {d for key in run_keys for d in store.manifest['runs'][key]['files'].values()}
+    objects = sum(store.manifest['objects'][d]['size'] for d in digests)
+    return objects + sum(_run_size(Path(key)) for key in run_keys if Path(key).exists())
+
+
+def apply_retention(store: ArtifactStore, max_age_days: float = None, max_size_mb: float = None) -> None:
+    """Deletes whole runs older than max_age_days, then oldest runs until under max_size_mb."""
+    run_keys = sorted(store.manifest['runs'], key=lambda key: store.manifest['runs'][key].get('mtime', 0))
+    now = time.time()
+    removed = []
+    if max_age_days is not None:
+        removed = [key for key in run_keys
+                   if now - store.manifest['runs'][key].get('mtime', now) > max_age_days * 86400]
+    if max_size_mb is not None:
+        kept = [key for key in run_keys if key not in removed]
+        while kept and _runs_size(store, kept) > max_size_mb * 1024 * 1024:
+            removed.append(kept.pop(0))
+    for run_key in removed:
+        logger.info(f"Retention: removing run {run_key}")
+        shutil.rmtree(run_key, ignore_errors=True)
+        del store.manifest['runs'][run_key]
+    collect_garbage(store)
+
+
+def collect_garbage(store: ArtifactStore) -> None:
+    """Removes objects no run references any more."""
+    referenced = {d for run in store.manifest['runs'].values() for d in run['files'].values()}
+    for digest in list(store.manifest['objects']):
+        if digest not in referenced:
+            store.object_path(digest, store.manifest['objects'][digest]['suffix']).unlink(missing_ok=True)
+            del store.manifest['objects'][digest]
+            logger.debug(f"Removed unreferenced object {digest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact, restore and expire Robot Framework result artifacts.')
+    parser.add_argument('--store', type=Path, default=DEFAULT_STORE, help='Artifact store directory (default: .artifacts)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compact = subparsers.add_parser('compact', help='Compress logs and deduplicate binaries of run directories')
+    compact.add_argument('run_dirs', type=Path, nargs='+')
+    restore = subparsers.add_parser('restore', help='Undo compaction of run directories')
+    restore.add_argument('run_dirs', type=Path, nargs='+')
+    retain = subparsers.add_parser('retain', help='Apply age/size based retention to compacted runs')
+    retain.add_argument('--max-age-days', type=float)
+    retain.add_argument('--max-size-mb', type=float)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    store = ArtifactStore(args.store)
+    if args.command == 'compact':
+        for run_dir in args.run_dirs:
+            if not run_dir.is_dir():
+                logger.error(f"Not a directory: {run_dir}")
+                continue
+            compact_run(store, run_dir)
+    elif args.command == 'restore':
+        for run_dir in args.run_dirs:
+            restore_run(store, run_dir)
+        collect_garbage(store)
+    else:
+        apply_retention(store, args.max_age_days, args.max_size_mb)
+    store.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cross-variant comparison of metrics.json files.
+
+Each variant is one metrics.json labelled with dimensions such as
+browser, environment or shard (``browser=firefox,env=qa:path/metrics.json``).
+Tests are aligned by suite path (without the root suite, whose name
+usually carries the browser) and test name, keywords by name. The result
+holds per-test duration deltas and status differences, keywords that are
+slow on one variant only, and per-dimension aggregates.
+
+Used by ``generate_metrics.py --compare``.
+"""
+
+import json
+import logging
+from pathlib import Path
+from statistics import median
+
+logger = logging.getLogger(__name__)
+
+# A keyword is a hotspot on a variant when its average is this much above the other variants' median
+HOTSPOT_RATIO = 1.5
+# ...and the extra time it costs there adds up to at least this many seconds
+HOTSPOT_MIN_EXCESS_SEC = 1.0
+MISSING = 'MISSING'
+
+
+def parse_variant_spec(spec: str) -> tuple[dict, Path]:
+    """Parses ``dim=value[,dim=value]:path`` into (dimensions, path); a bare path is labelled by its directory."""
+    dims_part, sep, path_part = spec.partition(':')
+    if not sep or '=' not in dims_part:
+        path = Path(spec)
+        return {'variant': path.parent.name or path.stem}, path
+    dims = {}
+    for pair in dims_part.split(','):
+        key, _, value = pair.partition('=')
+        if not key.strip() or not value.strip():
+            raise ValueError(f"Invalid dimension '{pair}' in '{spec}', expected name=value")
+        dims[key.strip()] = value.strip()
+    return dims, Path(path_part)
+
+
+def variant_label(dims: dict) -> str:
+    return ','.join(f"{key}={value}" for key, value in dims.items())
+
+
+def flatten_tests(metrics: dict) -> dict:
+    """Returns {'Suite.Sub.Test name': test} for every test, keyed without the root suite name."""
+    tests = {}
+
+    def walk(suite, path):
+        for test in suite.get('tests', []):
+            tests['.'.join(path + [test['name']])] = test
+        for child in suite.get('suites', []):
+            walk(child, path + [child['name']])
+
+    for root in metrics.get('suites', []):
+        walk(root, [])
+    return tests
+
+
+def _compare_tests(labels: list, tests_by_label: dict) -> tuple[dict, list]:
+    keys = sorted(set().union(*(tests.keys() for tests in tests_by_label.values())))
+    tests, status_differences = {}, []
+    for key in keys:
+        per_variant = {}
+        for label in labels:
+            test = tests_by_label[label].get(key)
+            per_variant[label] = ({'status': test['status'], 'duration': test['duration']} if test
+                                  else {'status': MISSING, 'duration': None})
+        durations = {label: v['duration'] for label, v in per_variant.items() if v['duration'] is not None}
+        fastest = min(durations.values()) if durations else 0.0
+        for label, duration in durations.items():
+            per_variant[label]['delta'] = round(duration - fastest, 3)
+        statuses = {v['status'] for v in per_variant.values()}
+        entry = {
+            'variants': per_variant,
+            'max_delta': round(max(durations.values()) - fastest, 3) if durations else 0.0,
+            'slowest': max(durations, key=durations.get) if durations else None,
+            'status_differs': len(statuses) > 1,
+        }
+        tests[key] = entry
+        if entry['status_differs']:
+            status_differences.append({'test': key, **{label: v['status'] for label, v in per_variant.items()}})
+    return tests, status_differences
+
+
+def _compare_keywords(labels: list, keywords_by_label: dict) -> tuple[dict, list]:
+    names = sorted(set().union(*(kws.keys() for kws in keywords_by_label.values())))
+    keywords, hotspots = {}, []
+    for name in names:
+        per_variant = {label: {'count': kws[name]['count'], 'avg_duration': kws[name]['avg_duration'],
+                               'total_duration': kws[name]['total_duration']}
+                       for label, kws in keywords_by_label.items() if name in kws}
+        keywords[name] = per_variant
+        if len(per_variant) < 2:
+            continue
+        for label, stats in per_variant.items():
+            baseline = median(v['avg_duration'] for other, v in per_variant.items() if other != label)
+            excess = (stats['avg_duration'] - baseline) * stats['count']
+            if stats['avg_duration'] > baseline * HOTSPOT_RATIO and excess >= HOTSPOT_MIN_EXCESS_SEC:
+                hotspots.append({'keyword': name, 'variant': label, 'avg_duration': stats['avg_duration'],
+                                 'baseline_avg_duration': round(baseline, 3), 'count': stats['count'],
+                                 'excess_time': round(excess, 3)})
+    hotspots.sort(key=lambda h: h['excess_time'], reverse=True)
+    return keywords, hotspots
+
+
+def _aggregate(variants: list, hotspots: list) -> dict:
+    """Totals per dimension value, the slowest value per dimension and the hotspots explaining it."""
+    aggregates = {}
+    dimensions = sorted({key for variant in variants for key in variant['dimensions']})
+    for dim in dimensions:
+        values = {}
+        for variant in variants:
+            value = variant['dimensions'].get(dim)
+            if value is None:
+                continue
+            agg = values.setdefault(value, {'variants': [], 'total_tests': 0, 'passed': 0, 'failed': 0,
+                                            'skipped': 0, 'duration': 0.0})
+            agg['variants'].append(variant['label'])
+            for key in ('total_tests', 'passed', 'failed', 'skipped'):
+                agg[key] += variant['totals'][key]
+            agg['duration'] = round(agg['duration'] + variant['totals']['duration'], 3)
+        for agg in values.values():
+            agg['avg_test_duration'] = round(agg['duration'] / agg['total_tests'], 3) if agg['total_tests'] else 0.0
+        slowest = max(values, key=lambda v: values[v]['avg_test_duration']) if values else None
+        aggregates[dim] = {
+            'values': values,
+            'slowest': slowest,
+            'slowest_hotspots': [h for h in hotspots if slowest and h['variant'] in values[slowest]['variants']][:10],
+        }
+    return aggregates
+
+
+def compare_metrics(variants: list[tuple[dict, dict]]) -> dict:
+    """Compares [(dimensions, metrics_data), ...] and returns the ``comparison`` report."""
+    labels, summaries, tests_by_label, keywords_by_label = [], [], {}, {}
+    for dims, metrics in variants:
+        label = variant_label(dims)
+        if label in tests_by_label:
+            raise ValueError(f"Duplicate variant '{label}'")
+        labels.append(label)
+        tests_by_label[label] = flatten_tests(metrics)
+        keywords_by_label[label] = metrics.get('all_keywords', {})
+        summaries.append({
+            'label': label,
+            'dimensions': dims,
+            'totals': {'total_tests': metrics.get('total_tests', 0), 'passed': metrics.get('passed_tests', 0),
+                       'failed': metrics.get('failed_tests', 0), 'skipped': metrics.get('skipped_tests', 0),
+                       'duration': metrics.get('duration', 0.0)},
+        })
+    tests, status_differences = _compare_tests(labels, tests_by_label)
+    keywords, hotspots = _compare_keywords(labels, keywords_by_label)
+    logger.info(f"Compared {len(labels)} variant(s): {len(tests)} test(s), {len(status_differences)} status "
+                f"difference(s), {len(hotspots)} keyword hotspot(s)")
+    return {
+        'variants': summaries,
+        'aggregates': _aggregate(summaries, hotspots),
+        'status_differences': status_differences,
+        'slowest_tests': sorted(({'test': key, 'slowest': t['slowest'], 'max_delta': t['max_delta']}
+                                 for key, t in tests.items() if t['slowest']),
+                                key=lambda t: t['max_delta'], reverse=True)[:25],
+        'keyword_hotspots': hotspots,
+        'tests': tests,
+        'keywords': keywords,
+    }
+
+
+def load_variants(specs: list[str]) -> list[tuple[dict, dict]]:
+    variants = []
+    for spec in specs:
+        dims, path = parse_variant_spec(spec)
+        if path.is_dir():
+            path = path / 'metrics.json'
+        logger.info(f"Loading variant {variant_label(dims)} from {path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            variants.append((dims, json.load(f)))
+    return variants
@@ -16,11 +16,13 @@ library_dir = script_dir / 'libraries'
 sys.path.insert(0, str(library_dir))
 
 try:
-    from TestMetrics import TestMetrics # Import the refactored visitor class
+    from TestMetrics import TestMetrics, ATTACHMENTS_DIR # Import the refactored visitor class
 except ImportError as e:
     print(f"Error importing TestMetrics: {e}", file=sys.stderr)
     print(f"Please ensure TestMetrics.py is in the directory: {library_dir}", file=sys.stderr)
     sys.exit(1)
+from search_index import build_search_index, SEARCH_SCRIPT
+from compare_metrics import compare_metrics, load_variants
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -74,8 +76,8 @@ def merge_results(output_files: list[Path]) -> Union[ExecutionResult, None]:
             logger.error(f"Error merging result files using ExecutionResult: {e}", exc_info=True)
             return None
 
-def generate_html_report(metrics_data: dict, report_html_path: Path):
-    """Generates the HTML report from metrics data using the template."""
+def generate_html_report(metrics_data: dict, report_html_path: Path, search_index: Union[dict, None] = None):
+    """Generates the HTML report from metrics data (and the optional search index) using the template."""
     logger.debug(f"Generating HTML report to: {report_html_path}")
     template_path = _TEMPLATE_PATH
     logger.debug(f"Using template path: {template_path}")
@@ -109,6 +111,18 @@ def generate_html_report(metrics_data: dict, report_html_path: Path):
         html_content = template_content.replace(placeholder, metrics_json_string)
         logger.debug(f"Placeholder '{placeholder}' replaced.")
 
+    # Embed Search Index
+    if search_index is not None:
+        index_script = f"<script>window.SEARCH_INDEX = {json.dumps(search_index, separators=(',', ':'))};</script>"
+        index_script += SEARCH_SCRIPT
+        if '{{SEARCH_INDEX}}' in html_content:
+            html_content = html_content.replace('{{SEARCH_INDEX}}', index_script)
+        elif '</body>' in html_content:
+            html_content = html_content.replace('</body>', index_script + '\n</body>', 1)
+        else:
+            html_content += index_script
+        logger.debug(f"Embedded search index ({len(index_script)} bytes).")
+
     # Write Report
     try:
         with open(report_html_path, 'w', encoding='utf-8') as f:
@@ -118,38 +132,14 @@ def generate_html_report(metrics_data: dict, report_html_path: Path):
         logger.error(f"CRITICAL ERROR: Failed to write final HTML report file {report_html_path}: {e}", exc_info=True)
         raise
 
-def main():
-    parser = argparse.ArgumentParser(description='Generate merged test metrics report from Robot Framework output.xml files.')
-    parser.add_argument('input_path', type=Path,
-                        help='Path to a single output.xml file or a directory containing output.xml files (searched recursively)')
-    parser.add_argument('output_dir', type=Path, 
-                        help='Directory to save metrics.json and index.html')
-    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
-    
-    args = parser.parse_args()
-
-    log_level = logging.DEBUG if args.verbose else logging.INFO
-    logging.getLogger().setLevel(log_level)
-    logger.info(f"Log level set to: {logging.getLevelName(log_level)}")
-
-    logger.info(f"Input path: {args.input_path}")
-    logger.info(f"Output directory: {args.output_dir}")
-
-    # --- Find and Merge Output Files ---
-    output_files = find_output_files(args.input_path)
-    if not output_files:
-        logger.error("No output.xml files found at the specified path. Exiting.")
-        sys.exit(1)
-    
-    result = merge_results(output_files)
-    if not result:
-        logger.error("Failed to load or merge result files. Exiting.")
-        sys.exit(1)
-    logger.info(f"Successfully loaded/merged results. Result object type: {type(result)}")
-
-    # --- Process Results with Visitor ---
+def collect_metrics(result: ExecutionResult, output_dir: Union[Path, None] = None) -> Union[dict, None]:
+    """
+    Runs the TestMetrics visitor over a result object and returns the metrics dictionary.
+    Embedded data: URIs and truncated messages are written to <output_dir>/attachments.
+    """
     logger.info("Initializing TestMetrics visitor...")
-    metrics_processor = TestMetrics()
+    attachment_dir = str(output_dir / ATTACHMENTS_DIR) if output_dir else None
+    metrics_processor = TestMetrics(attachment_dir=attachment_dir)
     try:
         logger.info("Attempting to visit the result object...")
         result.visit(metrics_processor) # Visit the merged or single result object
@@ -161,24 +151,25 @@ def main():
         logger.debug(f"Retrieved total tests: {metrics_data.get('total_tests', 'N/A')}")
     except Exception as visit_e:
         logger.error(f"CRITICAL ERROR during result visiting: {visit_e}", exc_info=True)
-        sys.exit(1)
+        return None
         
     if not metrics_data or not metrics_data.get('suites'):
          logger.error("CRITICAL ERROR: Metrics data is empty after processing. Check visitor logic and input XML.")
-         sys.exit(1)
+         return None
+    return metrics_data
 
-    # --- Prepare Output Directory and Paths ---
+def write_reports(metrics_data: dict, output_dir: Path) -> tuple[Path, Path]:
+    """Writes metrics.json and index.html to the output directory and returns their paths."""
     try:
-        args.output_dir.mkdir(parents=True, exist_ok=True)
-        logger.debug(f"Ensured output directory exists: {args.output_dir}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Ensured output directory exists: {output_dir}")
     except OSError as e_mkdir:
-         logger.error(f"CRITICAL ERROR: Failed to create output directory {args.output_dir}: {e_mkdir}", exc_info=True)
-         sys.exit(1)
+         logger.error(f"CRITICAL ERROR: Failed to create output directory {output_dir}: {e_mkdir}", exc_info=True)
+         raise
 
-    metrics_json_path = args.output_dir / 'metrics.json'
-    report_html_path = args.output_dir / 'index.html'
+    metrics_json_path = output_dir / 'metrics.json'
+    report_html_path = output_dir / 'index.html'
 
-    # --- Generate Reports --- 
     logger.info(f"Generating JSON report to: {metrics_json_path}")
     try:
         with open(metrics_json_path, 'w', encoding='utf-8') as f:
@@ -188,12 +179,107 @@ def main():
          logger.error(f"ERROR: Failed to save metrics JSON: {e}", exc_info=True)
          # Optionally exit here or allow HTML generation to proceed
 
+    logger.info("Building search index...")
+    try:
+        search_index = build_search_index(metrics_data)
+    except Exception as e:
+        logger.error(f"ERROR: Failed to build search index, report will have no search: {e}", exc_info=True)
+        search_index = None
+
     logger.info(f"Generating HTML report to: {report_html_path}")
     try:
-        generate_html_report(metrics_data, report_html_path)
+        generate_html_report(metrics_data, report_html_path, search_index)
         logger.info("Successfully generated HTML report.")
     except Exception as e:
         logger.error(f"Failed during HTML report generation step: {e}", exc_info=True)
+        raise
+    return metrics_json_path, report_html_path
+
+def run_comparison(specs: list[str], output_dir: Path) -> int:
+    """Writes comparison.json for the given variant specs and logs a summary; returns the exit code."""
+    if len(specs) < 2:
+        logger.error("--compare needs at least two metrics files.")
+        return 1
+    try:
+        comparison = compare_metrics(load_variants(specs))
+    except (OSError, ValueError) as e:
+        logger.error(f"ERROR: Failed to compare metrics: {e}", exc_info=True)
+        return 1
+    output_dir.mkdir(parents=True, exist_ok=True)
+    comparison_path = output_dir / 'comparison.json'
+    with open(comparison_path, 'w', encoding='utf-8') as f:
+        json.dump(comparison, f, indent=2)
+
+    logger.info(f"------------------------------------------")
+    logger.info(f"  Metrics Comparison Complete: {comparison_path}")
+    logger.info(f"------------------------------------------")
+    for dim, aggregate in comparison['aggregates'].items():
+        for value, agg in aggregate['values'].items():
+            logger.info(f"  {dim}={value}: {agg['total_tests']} test(s), {agg['failed']} failed, "
+                        f"{agg['duration']:.1f}s total, {agg['avg_test_duration']:.2f}s/test")
+        logger.info(f"  Slowest {dim}: {aggregate['slowest']}")
+        for hotspot in aggregate['slowest_hotspots'][:5]:
+            logger.info(f"    {hotspot['keyword']}: {hotspot['avg_duration']:.2f}s avg vs "
+                        f"{hotspot['baseline_avg_duration']:.2f}s elsewhere (+{hotspot['excess_time']:.1f}s)")
+    logger.info(f"  Status differences: {len(comparison['status_differences'])}")
+    for diff in comparison['status_differences'][:10]:
+        logger.info(f"    {diff['test']}: " + ', '.join(f"{k}: {v}" for k, v in diff.items() if k != 'test'))
+    logger.info(f"------------------------------------------")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate merged test metrics report from Robot Framework output.xml files.')
+    parser.add_argument('input_path', type=Path, nargs='?',
+                        help='Path to a single output.xml file or a directory containing output.xml files (searched recursively)')
+    parser.add_argument('output_dir', type=Path, 
+                        help='Directory to save metrics.json and index.html (comparison.json with --compare)')
+    parser.add_argument('--compare', action='append', default=[], metavar='DIM=VALUE[,DIM=VALUE]:METRICS_JSON',
+                        help='Compare metrics.json files of several runs instead of processing output.xml, '
+                             'e.g. browser=firefox:metrics-firefox/metrics.json (repeatable)')
+    parser.add_argument('--playwright-log', type=Path, action='append', default=[],
+                        help='Browser library playwright-log.txt to profile node methods from (repeatable)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    
+    args = parser.parse_args()
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.getLogger().setLevel(log_level)
+    logger.info(f"Log level set to: {logging.getLevelName(log_level)}")
+
+    if args.compare:
+        sys.exit(run_comparison(args.compare, args.output_dir))
+    if args.input_path is None:
+        parser.error('input_path is required unless --compare is given')
+
+    logger.info(f"Input path: {args.input_path}")
+    logger.info(f"Output directory: {args.output_dir}")
+
+    # --- Find and Merge Output Files ---
+    output_files = find_output_files(args.input_path)
+    if not output_files:
+        logger.error("No output.xml files found at the specified path. Exiting.")
+        sys.exit(1)
+    
+    result = merge_results(output_files)
+    if not result:
+        logger.error("Failed to load or merge result files. Exiting.")
+        sys.exit(1)
+    logger.info(f"Successfully loaded/merged results. Result object type: {type(result)}")
+
+    # --- Process Results and Generate Reports ---
+    metrics_data = collect_metrics(result, args.output_dir)
+    if not metrics_data:
+        sys.exit(1)
+    if args.playwright_log:
+        logger.info(f"Profiling Playwright node methods from {len(args.playwright_log)} log file(s)...")
+        try:
+            from playwright_profiler import build_profile
+            metrics_data['playwright_profile'] = build_profile(args.playwright_log, output_files)
+        except Exception as e:
+            logger.error(f"ERROR: Failed to build Playwright profile: {e}", exc_info=True)
+    try:
+        metrics_json_path, report_html_path = write_reports(metrics_data, args.output_dir)
+    except Exception:
         sys.exit(1)
 
     # --- Final Summary --- 
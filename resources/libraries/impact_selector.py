@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Change-impact test selection.
+
+Parses the Robot data (.robot/.resource), Python libraries and the
+Browser JS extension into a dependency graph (test -> keyword -> resource
+keyword/locator variable -> library keyword or function), maps the lines
+of a git diff onto the symbols they touch and writes the tests reachable
+from those symbols as a Robot argument file. Parsed files are cached by
+content hash, so only edited files are parsed again.
+
+Changes the graph cannot attribute (e.g. requirements.txt, .env, data
+files read from code) select every test; files matching --ignore and
+not referenced by test data select nothing.
+
+Usage:
+    python3 resources/libraries/impact_selector.py --base origin/main -o affected.args [--explain]
+    robot -A affected.args -d results tests
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict, deque
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional
+from robot.api.parsing import get_model, get_resource_model, Keyword, TestCase, Token
+from robot.model import TestSuite
+from robot.utils import normalize
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = Path('.impact_cache.json')
+SCAN_DIRS = ['tests', 'resources', 'libraries']
+SUITE_DIRS = ['tests']
+ROBOT_SUFFIXES = ('.robot', '.resource')
+# Files no test data refers to that never require a test run (reporting tools, docs, old results).
+# The runners (parallel_runner.py, browser_server.py, ...) drive the test run itself, so they are not here.
+REPORTING_TOOLS = ['generate_metrics.py', 'TestMetrics.py', 'search_index.py', 'compare_metrics.py',
+                   'playwright_profiler.py', 'import_benchmark.py', 'compact_artifacts.py']
+DEFAULT_IGNORE = ['*.md', '*.drawio', '.gitignore', 'results/*', 'res/*', 'metrics/*'] + \
+    [f'resources/libraries/{name}' for name in REPORTING_TOOLS]
+# Keyword names taking other keyword names as arguments (Run Keyword, Wait Until Keyword Succeeds, ...)
+RUN_KEYWORD_RE = re.compile(r'keyword', re.IGNORECASE)
+VARIABLE_RE = re.compile(r'[$@&%]\{\s*([^{}\[\]]+?)\s*\}')
+EVAL_VARIABLE_RE = re.compile(r'\$([A-Za-z_]\w*)')
+JS_FUNCTION_RE = re.compile(r'^(?:async\s+)?function\s+(\w+)\s*\(', re.MULTILINE)
+JS_EXPORT_RE = re.compile(r'^exports\.(\w+)\s*=', re.MULTILINE)
+HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+KEYWORD_CALL_SETTINGS = (Token.SETUP, Token.TEARDOWN, Token.TEMPLATE, Token.SUITE_SETUP, Token.SUITE_TEARDOWN,
+                         Token.TEST_SETUP, Token.TEST_TEARDOWN, Token.TEST_TEMPLATE)
+
+
+def _norm(name: str) -> str:
+    return normalize(name, ignore='_')
+
+
+def _variable_uses(statement) -> set[str]:
+    uses = set()
+    for token in statement.tokens:
+        if token.type in (Token.SEPARATOR, Token.EOL, Token.EOS, Token.COMMENT):
+            continue
+        uses.update(_norm(name) for name in VARIABLE_RE.findall(token.value))
+        uses.update(_norm(name) for name in EVAL_VARIABLE_RE.findall(token.value))
+    return uses
+
+
+def _keyword_calls(statement) -> list[str]:
+    if statement.type == Token.KEYWORD:
+        name, args = statement.keyword, list(statement.args)
+    elif statement.type in KEYWORD_CALL_SETTINGS:
+        name = statement.get_value(Token.NAME)
+        args = list(statement.get_values(Token.ARGUMENT))
+    else:
+        return []
+    if not name:
+        return []
+    # Arguments of Run Keyword variants may be keywords; unresolvable ones are dropped later
+    return [name] + (args if RUN_KEYWORD_RE.search(name) else [])
+
+
+# --- Parsing ---
+
+def _walk_statements(node):
+    if hasattr(node, 'tokens'):
+        yield node
+    for child in getattr(node, 'body', ()):
+        yield from _walk_statements(child)
+    for attr in ('header', 'end', 'next', 'orelse', 'handlers', 'finalbranch'):
+        child = getattr(node, attr, None)
+        if child is None:
+            continue
+        for item in (child if isinstance(child, list) else [child]):
+            yield from _walk_statements(item)
+
+
+def _block_record(block) -> dict:
+    calls, uses = [], set()
+    for statement in _walk_statements(block):
+        calls.extend(_keyword_calls(statement))
+        uses |= _variable_uses(statement)
+    return {'name': block.name, 'lines': [block.lineno, block.end_lineno], 'calls': calls, 'vars': sorted(uses)}
+
+
+def parse_robot(path: Path) -> dict:
+    """Returns imports, tests, keywords, variables and suite-level calls of a Robot data file."""
+    model = get_model(path) if path.suffix == '.robot' else get_resource_model(path)
+    record = {'type': 'robot', 'imports': [], 'tests': [], 'keywords': [], 'variables': [],
+              'suite': {'calls': [], 'vars': []}}
+    suite_uses = set()
+    for section in model.sections:
+        for item in section.body:
+            if isinstance(item, TestCase):
+                record['tests'].append(_block_record(item))
+            elif isinstance(item, Keyword):
+                record['keywords'].append(_block_record(item))
+            elif item.type in (Token.RESOURCE, Token.LIBRARY, Token.VARIABLES):
+                record['imports'].append({'kind': item.type, 'name': item.name, 'args': list(getattr(item, 'args', ()))})
+            elif item.type in KEYWORD_CALL_SETTINGS:
+                record['suite']['calls'].extend(_keyword_calls(item))
+                suite_uses |= _variable_uses(item)
+            elif item.type == Token.VARIABLE:
+                name = _norm(item.name.strip('$@&%{}= '))
+                record['variables'].append({'name': name, 'lines': [item.lineno, item.end_lineno],
+                                            'vars': sorted(_variable_uses(item) - {name})})
+    record['suite']['vars'] = sorted(suite_uses)
+    return record
+
+
+class _FunctionVisitor(ast.NodeVisitor):
+    """Collects the calls of one function: self/bare function names and run_keyword targets."""
+
+    def __init__(self):
+        self.functions, self.keywords = set(), []
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            if isinstance(func.value, ast.Name) and func.value.id in ('self', 'cls'):
+                self.functions.add(func.attr)
+            if func.attr.startswith('run_keyword') and node.args and isinstance(node.args[0], ast.Constant) \
+                    and isinstance(node.args[0].value, str):
+                self.keywords.append(node.args[0].value)
+        elif isinstance(func, ast.Name):
+            self.functions.add(func.id)
+        self.generic_visit(node)
+
+
+def _keyword_decorator_name(function) -> Optional[str]:
+    for decorator in function.decorator_list:
+        if isinstance(decorator, ast.Call) and getattr(decorator.func, 'id', None) == 'keyword':
+            name = decorator.args[0] if decorator.args else next(
+                (kw.value for kw in decorator.keywords if kw.arg == 'name'), None)
+            if isinstance(name, ast.Constant) and isinstance(name.value, str):
+                return name.value
+    return None
+
+
+def parse_python(path: Path) -> dict:
+    """Returns functions (with keyword names), module variables and imported modules of a Python file."""
+    try:
+        tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+    except (SyntaxError, UnicodeDecodeError):
+        return {'type': 'opaque'}
+    record = {'type': 'python', 'functions': [], 'variables': [], 'modules': [], 'dynamic_variables': False}
+
+    def add_function(function, in_class):
+        visitor = _FunctionVisitor()
+        visitor.visit(function)
+        public = not function.name.startswith('_')
+        record['functions'].append({
+            'name': function.name,
+            'keyword': _keyword_decorator_name(function) or (function.name if public else None),
+            'lines': [function.lineno - len(function.decorator_list), function.end_lineno],
+            'calls': sorted(visitor.functions), 'keyword_calls': visitor.keywords, 'method': in_class})
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            record['modules'].extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            record['modules'].append(node.module)
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            add_function(node, False)
+            record['dynamic_variables'] |= node.name in ('get_variables', 'getVariables')
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    add_function(item, True)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and not target.id.startswith('_'):
+                    record['variables'].append({'name': _norm(target.id), 'lines': [node.lineno, node.end_lineno]})
+    return record
+
+
+def parse_js(path: Path) -> dict:
+    """Returns the exported top-level functions of a Browser JS extension; they become keywords."""
+    text = path.read_text(encoding='utf-8')
+    exported = set(JS_EXPORT_RE.findall(text))
+    starts = [(text.count('\n', 0, m.start()) + 1, m.group(1)) for m in JS_FUNCTION_RE.finditer(text)]
+    record = {'type': 'js', 'functions': []}
+    for index, (line, name) in enumerate(starts):
+        end = starts[index + 1][0] - 1 if index + 1 < len(starts) else text.count('\n') + 1
+        if name in exported:
+            record['functions'].append({'name': name, 'keyword': name, 'lines': [line, end], 'calls': []})
+    return record
+
+
+def parse_file(path: Path) -> dict:
+    if path.suffix in ROBOT_SUFFIXES:
+        return parse_robot(path)
+    if path.suffix == '.py':
+        return parse_python(path)
+    if path.suffix == '.js':
+        return parse_js(path)
+    return {'type': 'opaque'}
+
+
+# --- Cache ---
+
+def load_records(root: Path, cache_path: Path) -> dict:
+    """Returns {relative path: record} for all scanned files, parsing only files whose hash changed."""
+    cache = {}
+    if cache_path.exists():
+        try:
+            data = json.loads(cache_path.read_text(encoding='utf-8'))
+            if data.get('version') == CACHE_VERSION:
+                cache = data['files']
+        except (ValueError, KeyError):
+            logger.warning(f"Ignoring unreadable cache {cache_path}")
+    files, parsed = {}, 0
+    for scan_dir in SCAN_DIRS:
+        for dirpath, dirnames, filenames in os.walk(root / scan_dir):
+            dirnames[:] = [d for d in dirnames if d != '__pycache__' and not d.startswith('.')]
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if path.suffix not in ROBOT_SUFFIXES + ('.py', '.js'):
+                    continue
+                rel = path.relative_to(root).as_posix()
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                entry = cache.get(rel)
+                if not entry or entry['sha256'] != digest:
+                    entry = {'sha256': digest, 'record': parse_file(path)}
+                    parsed += 1
+                files[rel] = entry
+    if parsed or set(files) != set(cache):
+        cache_path.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}), encoding='utf-8')
+    logger.debug(f"Parsed {parsed} of {len(files)} file(s), the rest came from {cache_path}")
+    return {rel: entry['record'] for rel, entry in files.items()}
+
+
+# --- Graph ---
+
+def _embedded_regex(name: str) -> Optional[re.Pattern]:
+    if '${' not in name:
+        return None
+    parts = re.split(r'\$\{[^}]+\}', name)
+    return re.compile('.*?'.join(re.escape(part) for part in parts), re.IGNORECASE)
+
+
+def _function_node(path: str, function: dict) -> str:
+    if function['keyword']:
+        return f"keyword:{path}::{function['keyword']}"
+    return f"function:{path}::{function['name']}"
+
+
+class DependencyGraph:
+    """Symbols of all files and, per symbol, the symbols depending on it."""
+
+    def __init__(self, root: Path, records: dict, suite_dirs: list[str]):
+        self.root = root
+        self.records = records
+        self.suite_dirs = tuple(d.rstrip('/') + '/' for d in suite_dirs)
+        self.dependents = defaultdict(set)
+        self.symbols = defaultdict(list)  # file -> [(node, (first line, last line))]
+        self.importers = defaultdict(set)  # imported file -> importing Robot files
+        self.tests = {}  # test node -> (suite file, test name)
+        self._imports = {}  # Robot file -> {import type: [files]}
+        self._keywords = defaultdict(lambda: defaultdict(list))  # file -> normalized name -> nodes
+        self._embedded = defaultdict(list)  # file -> [(regex, node)]
+        self._variables = defaultdict(lambda: defaultdict(list))  # file -> normalized name -> nodes
+        robot_files = [path for path, record in records.items() if record['type'] == 'robot']
+        for path in robot_files:
+            self._index_robot(path, records[path])
+        for path, record in records.items():
+            if record['type'] in ('python', 'js'):
+                self._index_code(path, record)
+        for path in robot_files:
+            self._link_robot(path, records[path])
+        for path, record in records.items():
+            if record['type'] == 'python':
+                self._link_python(path, record)
+
+    def _add(self, node: str, dependency: str):
+        self.dependents[dependency].add(node)
+
+    def _resolve_path(self, importer: str, name: str) -> Optional[str]:
+        base = (self.root / importer).parent
+        name = name.replace('${CURDIR}', str(base)).replace('${EXECDIR}', str(self.root))
+        if '${' in name:
+            return None
+        candidates = [base / name, self.root / name]
+        if not Path(name).suffix:
+            candidates += [self.root / d / f"{name}.py" for d in ('libraries', 'resources/libraries')]
+        candidates = [Path(os.path.normpath(c)) for c in candidates]
+        for candidate in candidates:
+            if candidate.exists() and candidate.is_relative_to(self.root):
+                return candidate.relative_to(self.root).as_posix()
+        # Missing files still resolve, so deleting them affects the importers
+        if candidates[0].suffix and candidates[0].is_relative_to(self.root):
+            return candidates[0].relative_to(self.root).as_posix()
+        return None
+
+    def _index_robot(self, path: str, record: dict):
+        for kind in ('tests', 'keywords', 'variables'):
+            for symbol in record[kind]:
+                node = f"{kind[:-1]}:{path}::{symbol['name']}"
+                self.symbols[path].append((node, tuple(symbol['lines'])))
+                if kind == 'keywords':
+                    self._keywords[path][_norm(symbol['name'])].append(node)
+                    regex = _embedded_regex(symbol['name'])
+                    if regex:
+                        self._embedded[path].append((regex, node))
+                elif kind == 'variables':
+                    self._variables[path][symbol['name']].append(node)
+                elif path.startswith(self.suite_dirs):
+                    self.tests[node] = (path, symbol['name'])
+        imports = {Token.RESOURCE: [], Token.LIBRARY: [], Token.VARIABLES: []}
+        for item in record['imports']:
+            # Library arguments may name files too, e.g. Browser's jsextension
+            names = [item['name']] + [arg.split('=', 1)[-1] for arg in item['args']
+                                      if arg.endswith(('.js', '.py'))]
+            for target in filter(None, (self._resolve_path(path, name) for name in names)):
+                imports[item['kind']].append(target)
+                self.importers[target].add(path)
+        self._imports[path] = imports
+
+    def _index_code(self, path: str, record: dict):
+        for function in record['functions']:
+            node = _function_node(path, function)
+            self.symbols[path].append((node, tuple(function['lines'])))
+            if function['keyword']:
+                self._keywords[path][_norm(function['keyword'])].append(node)
+            self._add(f"file:{path}", node)
+        # Module level names are only symbols of their own in variable files
+        if any(path in imports[Token.VARIABLES] for imports in self._imports.values()):
+            for variable in record.get('variables', []):
+                node = f"variable:{path}::{variable['name']}"
+                self.symbols[path].append((node, tuple(variable['lines'])))
+                self._variables[path][variable['name']].append(node)
+
+    def _scope(self, path: str) -> tuple[list[str], list[str], list[str]]:
+        """Files whose keywords and variables are visible in ``path``: resources, libraries, variable files."""
+        resources, seen, stack = [], {path}, [path]
+        while stack:
+            current = stack.pop()
+            resources.append(current)
+            for target in self._imports.get(current, {}).get(Token.RESOURCE, []):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        libraries = [lib for res in resources for lib in self._imports.get(res, {}).get(Token.LIBRARY, [])]
+        variable_files = [var for res in resources for var in self._imports.get(res, {}).get(Token.VARIABLES, [])]
+        return resources, libraries, variable_files
+
+    def _resolve_keyword(self, name: str, files: list[str]) -> list[str]:
+        candidates = [_norm(name)]
+        if '.' in name:
+            candidates.append(_norm(name.rsplit('.', 1)[1]))
+        for key in candidates:
+            nodes = [node for f in files for node in self._keywords[f].get(key, [])]
+            if nodes:
+                return nodes
+        return [node for f in files for regex, node in self._embedded[f] if regex.fullmatch(name)]
+
+    def _resolve_variable(self, name: str, resources: list[str], variable_files: list[str]) -> list[str]:
+        nodes = [node for f in resources + variable_files for node in self._variables[f].get(name, [])]
+        if nodes:
+            return nodes
+        # Unknown names may come from dynamic or YAML variable files
+        return [f"file:{f}" for f in variable_files
+                if self.records.get(f, {}).get('type') != 'python' or self.records[f].get('dynamic_variables')]
+
+    def _link_block(self, node: str, block: dict, scope: tuple):
+        resources, libraries, variable_files = scope
+        for call in block.get('calls', []):
+            for target in self._resolve_keyword(call, resources + libraries):
+                self._add(node, target)
+        for name in block.get('vars', []):
+            for target in self._resolve_variable(name, resources, variable_files):
+                if target != node:
+                    self._add(node, target)
+
+    def _link_robot(self, path: str, record: dict):
+        scope = self._scope(path)
+        suite = f"suite:{path}"
+        self._link_block(suite, record['suite'], scope)
+        for kind in ('tests', 'keywords', 'variables'):
+            for block in record[kind]:
+                node = f"{kind[:-1]}:{path}::{block['name']}"
+                self._link_block(node, block, scope)
+                if kind != 'tests':
+                    continue
+                self._add(node, suite)
+                for parent in Path(path).parents:
+                    init = (parent / '__init__.robot').as_posix()
+                    if init in self.records:
+                        self._add(node, f"suite:{init}")
+        # Opaque imported files (YAML variables, unparsable code) affect the whole importer
+        for target in sum(self._imports[path].values(), []):
+            if self.records.get(target, {'type': 'opaque'})['type'] == 'opaque':
+                for node, _ in self.symbols[path]:
+                    self._add(node, f"file:{target}")
+
+    def _link_python(self, path: str, record: dict):
+        modules = {module.rsplit('.', 1)[-1] for module in record['modules']}
+        module_files = [f for f in self.records if f.endswith('.py') and Path(f).stem in modules and f != path]
+        functions = {function['name']: function for function in record['functions']}
+        for function in record['functions']:
+            node = _function_node(path, function)
+            for called in function['calls']:
+                if called in functions and called != function['name']:
+                    self._add(node, _function_node(path, functions[called]))
+            # Library state comes from __init__
+            if function['method'] and '__init__' in functions and function['name'] != '__init__':
+                self._add(node, _function_node(path, functions['__init__']))
+            for call in function['keyword_calls']:
+                for target in self._resolve_keyword(call, list(self.records)):
+                    self._add(node, target)
+            for module in module_files:
+                self._add(node, f"file:{module}")
+
+    def is_referenced(self, path: str) -> bool:
+        """Whether any test depends on ``path``."""
+        return bool(self.affected_tests(self.changed_nodes(path, None)))
+
+    def changed_nodes(self, path: str, lines: Optional[set[int]]) -> set[str]:
+        """Nodes touched by changed ``lines`` of ``path`` (None: the whole file or a deleted file)."""
+        record = self.records.get(path)
+        if record is None:
+            # Deleted: whatever imported it changes with it
+            return set().union(*(self.changed_nodes(importer, None) for importer in self.importers.get(path, ())))
+        symbols = self.symbols.get(path, [])
+        if lines is not None and record['type'] != 'opaque' and not record.get('dynamic_variables'):
+            touched = set()
+            for line in lines:
+                hits = {node for node, (first, last) in symbols if first <= line <= last}
+                if not hits:
+                    break
+                touched |= hits
+            else:
+                return touched
+        # Settings, imports and module level code: everything in the file
+        nodes = {node for node, _ in symbols} | {f"file:{path}"}
+        if record['type'] == 'robot':
+            nodes.add(f"suite:{path}")
+        return nodes
+
+    def affected_tests(self, changed: set[str]) -> dict[str, str]:
+        """Returns {test node: changed node it depends on}."""
+        origin = {node: node for node in changed}
+        queue = deque(changed)
+        while queue:
+            node = queue.popleft()
+            for dependent in self.dependents.get(node, ()):
+                if dependent not in origin:
+                    origin[dependent] = origin[node]
+                    queue.append(dependent)
+        return {node: source for node, source in origin.items() if node in self.tests}
+
+
+# --- Diff ---
+
+def parse_diff(text: str) -> dict[str, Optional[set[int]]]:
+    """Returns {path: changed new-side line numbers}; deleted files map to None."""
+    changes, path = {}, None
+    old_path = None
+    for line in text.splitlines():
+        if line.startswith('--- '):
+            old_path = line[6:] if line.startswith('--- a/') else None
+        elif line.startswith('+++ '):
+            if line.startswith('+++ b/'):
+                path = line[6:]
+                changes.setdefault(path, set())
+            else:
+                path = None
+                if old_path:
+                    changes[old_path] = None
+        elif path and line.startswith('@@'):
+            match = HUNK_RE.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                # Pure deletions touch the lines around the removed ones
+                changes[path].update(range(start, start + count) if count else (start, start + 1))
+    return changes
+
+
+def git_diff(base: str, root: Path) -> str:
+    completed = subprocess.run(['git', 'diff', '-U0', '--no-color', '--no-renames', base, '--'],
+                               cwd=root, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"git diff {base} failed: {completed.stderr.strip()}")
+    return completed.stdout
+
+
+# --- Selection ---
+
+def _escape_pattern(text: str) -> str:
+    return re.sub(r'([*?\[])', r'[\1]', text)
+
+
+def select_tests(graph: DependencyGraph, changes: dict, ignore: list[str]) -> tuple[dict, list[str]]:
+    """Returns ({test node: changed node}, changed files outside the graph)."""
+    changed, unknown = set(), []
+    for path, lines in changes.items():
+        # Robot data is fully parsed; code nothing in the graph uses may still run as listener or pre-run hook
+        if path.endswith(ROBOT_SUFFIXES) or graph.is_referenced(path):
+            changed |= graph.changed_nodes(path, lines)
+        elif not any(fnmatch(path, pattern) for pattern in ignore):
+            unknown.append(path)
+    return graph.affected_tests(changed), unknown
+
+
+def write_argument_file(path: Path, graph: DependencyGraph, affected: dict, unknown: list[str], base: str):
+    lines = []
+    if unknown:
+        lines.append(f"# All tests: changes outside the dependency graph ({', '.join(sorted(unknown))})")
+    elif not affected:
+        lines += [f"# No tests affected by changes against {base}",
+                  '--runemptysuite', '--include __no_affected_tests__']
+    else:
+        # Parallel workers get suites without any selected test
+        lines += [f"# {len(affected)} test(s) affected by changes against {base}", '--runemptysuite']
+        for node in sorted(affected, key=lambda n: graph.tests[n]):
+            suite_file, test = graph.tests[node]
+            suite = TestSuite.name_from_source(suite_file)
+            # The leading * matches any parent suites, whichever directory robot is started with
+            lines.append(f"--test *{_escape_pattern(suite)}.{_escape_pattern(test)}")
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Select the tests affected by a change as a Robot argument file.')
+    parser.add_argument('--base', default='HEAD', help='Git revision to diff against (default: HEAD)')
+    parser.add_argument('--diff', help="Read a unified diff from this file ('-' for stdin) instead of running git diff")
+    parser.add_argument('--output', '-o', type=Path, default=Path('affected.args'),
+                        help='Argument file to write (default: affected.args)')
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE, help=f'Parse cache (default: {DEFAULT_CACHE})')
+    parser.add_argument('--suites', action='append', help="Directory of test suites (repeatable, default: tests)")
+    parser.add_argument('--ignore', action='append', help='Pattern of changed files that never need tests '
+                                                          f"(repeatable, default: {', '.join(DEFAULT_IGNORE)})")
+    parser.add_argument('--explain', action='store_true', help='Log the changed symbol each selected test depends on')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    root = Path(subprocess.run(['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True)
+                .stdout.strip() or '.').resolve()
+    started = time.perf_counter()
+    if args.diff:
+        diff = sys.stdin.read() if args.diff == '-' else Path(args.diff).read_text(encoding='utf-8')
+    else:
+        diff = git_diff(args.base, root)
+    changes = parse_diff(diff)
+    cache = args.cache if args.cache.is_absolute() else root / args.cache
+    graph = DependencyGraph(root, load_records(root, cache), args.suites or SUITE_DIRS)
+    affected, unknown = select_tests(graph, changes, args.ignore or DEFAULT_IGNORE)
+    write_argument_file(args.output, graph, affected, unknown, args.base)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if unknown:
+        logger.info(f"{len(changes)} changed file(s), {len(unknown)} outside the dependency graph: selecting all tests")
+    else:
+        logger.info(f"{len(changes)} changed file(s): {len(affected)} of {len(graph.tests)} test(s) affected")
+    if args.explain:
+        for node, origin in sorted(affected.items()):
+            logger.info(f"  {node.split(':', 1)[1]}  <-  {origin}")
+    logger.info(f"Selection took {elapsed_ms:.0f} ms, argument file written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
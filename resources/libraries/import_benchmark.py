@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import-time and initialization benchmark for the keyword libraries.
+
+Every measurement runs in a fresh interpreter (like each robot process
+and pabot/parallel_runner worker). Robot Framework's own modules are
+imported before the clock starts, so only the library's cost is timed.
+"cold" runs use an empty bytecode cache, "warm" runs the normal one.
+With --baseline, exits non-zero when a library got slower than allowed.
+
+Usage:
+    python3 resources/libraries/import_benchmark.py [--repeat 5] [--json bench.json] [--baseline bench.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+LIBRARY_DIRS = [PROJECT_ROOT / 'libraries', PROJECT_ROOT / 'resources' / 'libraries']
+DEFAULT_LIBRARIES = ['BrowserPool', 'Config', 'EnvLibrary', 'FlakyRerun', 'KeywordProfiler', 'LocalStandIn',
+                     'LocatorBenchmark', 'LoggerLibrary', 'SessionCache', 'WaitBudget', 'TestMetrics']
+# Constructor arguments keeping initialization away from a running Robot context
+INIT_ARGS = {'LoggerLibrary': {'screenshot_directory': 'screenshots'}}
+# Differences below this are noise, whatever the ratio says
+MIN_REGRESSION_MS = 20.0
+
+_SNIPPET = """
+import sys, json, time
+sys.path[:0] = {paths!r}
+import robot.api, robot.api.deco, robot.libraries.BuiltIn
+started = time.perf_counter()
+module = __import__({name!r})
+imported = time.perf_counter()
+result = {{'import_ms': (imported - started) * 1000, 'init_ms': None, 'error': None}}
+cls = getattr(module, {name!r}, None)
+if isinstance(cls, type):
+    try:
+        cls(**{kwargs!r})
+        result['init_ms'] = (time.perf_counter() - imported) * 1000
+    except Exception as e:
+        result['error'] = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps(result))
+"""
+
+
+def measure_once(name: str, cold: bool, workdir: Path) -> dict:
+    """Imports and initializes one library in a fresh interpreter and returns its timings."""
+    code = _SNIPPET.format(paths=[str(d) for d in LIBRARY_DIRS], name=name, kwargs=INIT_ARGS.get(name, {}))
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if cold:
+            env['PYTHONPYCACHEPREFIX'] = cache_dir
+        completed = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env,
+                                   capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': (completed.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark(names: list[str], repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            entry = {}
+            measure_once(name, False, Path(workdir))  # Prime the bytecode cache for the warm runs
+            for mode in ('cold', 'warm'):
+                runs = [measure_once(name, mode == 'cold', Path(workdir)) for _ in range(repeat)]
+                errors = [r['error'] for r in runs if r.get('error')]
+                import_ms = [r['import_ms'] for r in runs if 'import_ms' in r]
+                init_ms = [r['init_ms'] for r in runs if r.get('init_ms') is not None]
+                entry[mode] = {
+                    'import_ms': round(median(import_ms), 1) if import_ms else None,
+                    'init_ms': round(median(init_ms), 1) if init_ms else None,
+                    'error': errors[0] if errors else None,
+                }
+            results[name] = entry
+            logger.info(f"{name}: cold import {entry['cold']['import_ms']} ms, warm import "
+                        f"{entry['warm']['import_ms']} ms, init {entry['warm']['init_ms']} ms")
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, max_ratio: float) -> list[str]:
+    regressions = []
+    for name, entry in results.items():
+        for mode, stats in entry.items():
+            for key in ('import_ms', 'init_ms'):
+                old = baseline.get(name, {}).get(mode, {}).get(key)
+                new = stats.get(key)
+                if old is None or new is None:
+                    continue
+                if new > old * max_ratio and new - old >= MIN_REGRESSION_MS:
+                    regressions.append(f"{name} {mode} {key}: {old} ms -> {new} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark import and initialization time of the keyword libraries.')
+    parser.add_argument('libraries', nargs='*', default=DEFAULT_LIBRARIES, help='Library module names (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per library and mode, median is reported (default: 5)')
+    parser.add_argument('--json', type=Path, help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', type=Path, help='Compare against a previous --json result')
+    parser.add_argument('--max-regression', type=float, default=1.5,
+                        help='Allowed slowdown factor against the baseline (default: 1.5)')
+    args = parser.parse_args()
+
+    results = benchmark(args.libraries, args.repeat)
+
+    print(f"{'library':<18}{'cold import ms':>16}{'warm import ms':>16}{'init ms':>10}  error")
+    for name, entry in results.items():
+        error = entry['cold']['error'] or entry['warm']['error'] or ''
+        print(f"{name:<18}{str(entry['cold']['import_ms']):>16}{str(entry['warm']['import_ms']):>16}"
+              f"{str(entry['warm']['init_ms']):>10}  {error}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.info(f"Results written to {args.json}")
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(args.baseline.read_text(encoding='utf-8')),
+                                       args.max_regression)
+        for regression in regressions:
+            logger.error(f"Startup regression: {regression}")
+        if regressions:
+            return 1
+        logger.info("No startup regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-user load scenario runner.
+
+Starts N virtual users following a ramp-up profile. Every user runs
+tests/load/shopping_flow.robot, which loops over the regular Login With
+Credentials / Add Product To Cart / Logout keywords, each iteration in a
+fresh browser context. All users share one browser per browser type: an
+in-process browser_server.BrowserDaemon leases each user a Browser
+library node wrapper and the shared browser's endpoint, which BrowserPool
+connects to. Robot keywords are not thread-safe, so a user still is a
+``robot`` process of its own; the browser, by far the largest part, is
+not. The memory of the whole process tree is sampled during the run and
+the per-user overhead estimated from it.
+
+Afterwards the user outputs are combined, step keyword timings turned
+into throughput and latency percentiles, and written into the regular
+metrics report under ``load``.
+
+Usage:
+    python3 resources/libraries/load_runner.py --users 10 --ramp-up 30s --duration 2m [--base-url URL | --local] -d load_results
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+import psutil
+from robot.api import ExecutionResult, ResultVisitor
+from robot.utils import timestr_to_secs
+
+# Make generate_metrics, browser_server and the keyword libraries importable
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'libraries'))
+from browser_server import BrowserDaemon, lease_environment
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCENARIO = Path('tests/load/shopping_flow.robot')
+DEFAULT_STEPS = ['Open Login Page In Pooled Browser', 'Login With Credentials', 'Verify Inventory Page Loaded',
+                 'Add Product To Cart', 'Logout']
+PERCENTILES = (50, 90, 95, 99)
+TIMELINE_BUCKET_SEC = 10
+MEMORY_SAMPLE_SEC = 1
+
+
+def ramp_schedule(users: int, ramp_up: float, profile: str, step_users: int) -> list[float]:
+    """Returns the start offset in seconds of every virtual user."""
+    if users <= 1 or ramp_up <= 0 or profile == 'immediate':
+        return [0.0] * users
+    if profile == 'step':
+        steps = max(1, (users + step_users - 1) // step_users)
+        interval = ramp_up / max(1, steps - 1)
+        return [(i // step_users) * interval for i in range(users)]
+    # linear
+    return [i * ramp_up / (users - 1) for i in range(users)]
+
+
+class VirtualUser(threading.Thread):
+    """Runs one virtual user as a robot process starting at its scheduled offset."""
+
+    def __init__(self, user_id: int, offset: float, started_at: float, args, env: dict, browsers=None):
+        super().__init__(name=f"user-{user_id}", daemon=True)
+        self.user_id = user_id
+        self.offset = offset
+        self._started_at = started_at
+        self._args = args
+        self._env = env
+        self._browsers = browsers
+        self.output_dir = args.outputdir / 'users' / f"u{user_id:03d}"
+        self.output: Optional[Path] = None
+        self.active = (None, None)
+        self.running = False
+
+    def run(self):
+        time.sleep(max(0.0, self._started_at + self.offset - time.time()))
+        # Users started later stop at the same time as the first ones
+        duration = max(1.0, self._args.duration - self.offset) if not self._args.iterations else 10 ** 6
+        cmd = [sys.executable, '-m', 'robot', '--outputdir', str(self.output_dir),
+               '--output', 'output.xml', '--log', 'NONE', '--report', 'NONE', '--console', 'none',
+               '--name', f"User {self.user_id:03d}",
+               '--variable', f"LOAD_DURATION:{duration}s",
+               '--variable', f"LOAD_ITERATIONS:{self._args.iterations}",
+               '--variable', f"LOAD_USER_TYPE:{self._args.user_type}",
+               '--variable', f"LOAD_THINK_TIME:{self._args.think_time}",
+               str(self._args.scenario)]
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        env, lease = dict(self._env), None
+        if self._browsers:
+            try:
+                lease = self._browsers.lease(os.getpid(), f"user {self.user_id:03d}", os.getenv('BROWSER', 'chromium'),
+                                             os.getenv('HEADLESS', 'True').lower() == 'true')
+            except RuntimeError as e:
+                logger.warning(f"User {self.user_id:03d} launches its own browser, no shared one: {e}")
+            if lease:
+                env.update(lease_environment(lease))
+        begin = time.time()
+        self.running = True
+        with open(self.output_dir / 'console.txt', 'w', encoding='utf-8') as console:
+            rc = subprocess.call(cmd, env=env, stdout=console, stderr=subprocess.STDOUT)
+        self.running = False
+        self.active = (begin, time.time())
+        if lease:
+            self._browsers.release(lease['lease_id'], recycle=True)
+        if (self.output_dir / 'output.xml').exists():
+            self.output = self.output_dir / 'output.xml'
+        logger.info(f"User {self.user_id:03d} finished (rc={rc}) after {self.active[1] - begin:.1f}s")
+
+
+class MemorySampler(threading.Thread):
+    """Samples the RSS of all processes started by this runner together with the active user count."""
+
+    def __init__(self, users: list[VirtualUser]):
+        super().__init__(name='memory-sampler', daemon=True)
+        self._users = users
+        self.samples = []  # (timestamp, active users, RSS MB)
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(MEMORY_SAMPLE_SEC):
+            total = 0
+            for process in psutil.Process().children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    continue
+            active = sum(1 for user in self._users if user.running)
+            self.samples.append((time.time(), active, total / (1024 * 1024)))
+
+
+def memory_statistics(samples: list[tuple]) -> dict:
+    """
+    Peak memory and the per-user overhead (MB), fitted over the samples as base + users * per_user.
+
+    The RSS sum counts pages shared between processes more than once, so it
+    is an upper bound; compare runs rather than reading it as exact usage.
+    """
+    if not samples:
+        return {}
+    peak = max(samples, key=lambda sample: sample[2])
+    stats = {'peak_mb': round(peak[2], 1), 'peak_active_users': peak[1]}
+    points = [(users, mb) for _, users, mb in samples if users]
+    counts = {users for users, _ in points}
+    if len(counts) > 1:
+        mean_users = sum(u for u, _ in points) / len(points)
+        mean_mb = sum(mb for _, mb in points) / len(points)
+        slope = (sum((u - mean_users) * (mb - mean_mb) for u, mb in points)
+                 / sum((u - mean_users) ** 2 for u, _ in points))
+        stats['per_user_mb'] = round(slope, 1)
+        stats['base_mb'] = round(mean_mb - slope * mean_users, 1)
+    elif points:
+        # All users ran at once (no ramp-up); only the average is known
+        stats['per_user_mb'] = round(peak[2] / max(1, peak[1]), 1)
+    return stats
+
+
+class _StepTimings(ResultVisitor):
+    """Collects (start, elapsed, passed) of every step keyword."""
+
+    def __init__(self, steps: list[str]):
+        self.samples = {step: [] for step in steps}
+
+    def start_keyword(self, keyword):
+        samples = self.samples.get(keyword.name)
+        if samples is not None and keyword.start_time and keyword.status != 'NOT RUN':
+            samples.append((keyword.start_time.timestamp(), keyword.elapsed_time.total_seconds(),
+                            keyword.status == 'PASS'))
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def step_statistics(samples: list[tuple], window: float) -> dict:
+    """Throughput (per second over the load window) and latency percentiles (seconds) of one step."""
+    latencies = sorted(elapsed for _, elapsed, passed in samples if passed)
+    stats = {
+        'count': len(samples),
+        'passed': len(latencies),
+        'failed': len(samples) - len(latencies),
+        'throughput_per_sec': round(len(latencies) / window, 3) if window else 0.0,
+    }
+    if latencies:
+        stats['mean'] = round(sum(latencies) / len(latencies), 3)
+        stats['max'] = round(latencies[-1], 3)
+        stats.update({f"p{p}": round(_percentile(latencies, p), 3) for p in PERCENTILES})
+    return stats
+
+
+def build_load_section(result, steps: list[str], users: list[VirtualUser], args, memory_samples: list[tuple],
+                       shared: bool) -> dict:
+    timings = _StepTimings(steps)
+    result.visit(timings)
+    spans = [user.active for user in users if user.active[0] is not None]
+    start, end = min(s for s, _ in spans), max(e for _, e in spans)
+    window = end - start
+    timeline = []
+    for bucket_start in range(0, int(window) + 1, TIMELINE_BUCKET_SEC):
+        lo, hi = start + bucket_start, start + bucket_start + TIMELINE_BUCKET_SEC
+        completed = [(elapsed, passed) for samples in timings.samples.values()
+                     for ts, elapsed, passed in samples if lo <= ts + elapsed < hi]
+        memory = [mb for ts, _, mb in memory_samples if lo <= ts < hi]
+        timeline.append({
+            'offset_sec': bucket_start,
+            'active_users': sum(1 for s, e in spans if s < hi and e > lo),
+            'completed_steps': sum(1 for _, passed in completed if passed),
+            'failed_steps': sum(1 for _, passed in completed if not passed),
+            'memory_mb': round(max(memory), 1) if memory else None,
+        })
+    return {
+        'scenario': str(args.scenario),
+        'users': args.users,
+        'profile': args.profile,
+        'ramp_up_sec': args.ramp_up,
+        'duration_sec': round(window, 3),
+        'base_url': args.base_url or ('local stand-in' if args.local else os.getenv('TEST_ENV', 'staging')),
+        'browsers': 'shared' if shared else 'per user',
+        'memory': memory_statistics(memory_samples),
+        'steps': {step: step_statistics(samples, window) for step, samples in timings.samples.items()},
+        'timeline': timeline,
+    }
+
+
+def _log_dir(path: Path) -> Path:
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a multi-user load scenario built from the e2e keywords.')
+    parser.add_argument('--users', '-u', type=int, default=5, help='Number of virtual users (default: 5)')
+    parser.add_argument('--ramp-up', default='0s', help='Time until all users have started (default: 0s)')
+    parser.add_argument('--profile', choices=['linear', 'step', 'immediate'], default='linear',
+                        help='Ramp-up profile (default: linear)')
+    parser.add_argument('--step-users', type=int, default=2, help="Users started together with --profile step (default: 2)")
+    parser.add_argument('--duration', default='60s', help='Scenario duration (default: 60s)')
+    parser.add_argument('--iterations', type=int, default=0, help='Iterations per user instead of a duration')
+    parser.add_argument('--think-time', default='0s', help='Pause between iterations of a user (default: 0s)')
+    parser.add_argument('--user-type', default='standard', help='Config user type to log in as (default: standard)')
+    parser.add_argument('--base-url', help='Base URL to load (default: the TEST_ENV URL)')
+    parser.add_argument('--local', action='store_true', help='Serve the recorded local stand-in to all users')
+    parser.add_argument('--own-browsers', action='store_true',
+                        help='Launch a browser per user instead of sharing one (for comparing memory per user)')
+    parser.add_argument('--scenario', type=Path, default=DEFAULT_SCENARIO, help=f'Scenario suite (default: {DEFAULT_SCENARIO})')
+    parser.add_argument('--step', action='append', dest='steps', help='Step keyword to measure (repeatable, default: the flow keywords)')
+    parser.add_argument('--outputdir', '-d', type=Path, default=Path('load_results'), help='Output directory (default: load_results)')
+    parser.add_argument('--metrics-dir', type=Path, help='Metrics report directory (default: <outputdir>/metrics)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    args.ramp_up = timestr_to_secs(args.ramp_up)
+    args.duration = timestr_to_secs(args.duration)
+
+    env = dict(os.environ)
+    stand_in = None
+    if args.local:
+        from LocalStandIn import LocalStandInServer
+        stand_in = LocalStandInServer(latency_ms=os.getenv('LOCAL_STANDIN_LATENCY_MS', '0'))
+        args.base_url = stand_in.start()
+    if args.base_url:
+        env['BASE_URL'] = args.base_url
+    # Every iteration is a fresh context on purpose; cached sessions would skip the login step
+    env['SESSION_CACHE'] = 'False'
+
+    browsers = None
+    if not args.own_browsers:
+        try:
+            browsers = BrowserDaemon(max_clients=args.users, warm=0, idle_timeout=float('inf'), max_uses=1,
+                                     log_dir=_log_dir(args.outputdir / 'browser_server'))
+        except RuntimeError as e:
+            logger.warning(f"Every user launches its own browser, no shared browsers: {e}")
+
+    offsets = ramp_schedule(args.users, args.ramp_up, args.profile, args.step_users)
+    logger.info(f"Starting {args.users} virtual user(s), {args.profile} ramp-up over {args.ramp_up:.0f}s, "
+                f"{f'{args.iterations} iteration(s) each' if args.iterations else f'{args.duration:.0f}s'}")
+    started_at = time.time()
+    users = [VirtualUser(i + 1, offset, started_at, args, env, browsers) for i, offset in enumerate(offsets)]
+    sampler = MemorySampler(users)
+    sampler.start()
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    sampler.stopping.set()
+    if browsers:
+        browsers.stop()
+    if stand_in:
+        stand_in.stop()
+
+    outputs = [str(user.output) for user in users if user.output]
+    if not outputs:
+        logger.error("No virtual user produced an output.xml. Exiting.")
+        return 1
+    result = ExecutionResult(*outputs)
+
+    # --- Metrics Report ---
+    from generate_metrics import collect_metrics, write_reports
+    metrics_dir = args.metrics_dir or args.outputdir / 'metrics'
+    metrics_data = collect_metrics(result, metrics_dir)
+    if not metrics_data:
+        return 1
+    metrics_data['load'] = build_load_section(result, args.steps or DEFAULT_STEPS, users, args, sampler.samples,
+                                              browsers is not None)
+    try:
+        write_reports(metrics_data, metrics_dir)
+    except Exception:
+        logger.error("HTML report generation failed, see above.")
+
+    print(f"{'step':<36}{'count':>7}{'failed':>8}{'ops/s':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}")
+    for step, stats in metrics_data['load']['steps'].items():
+        print(f"{step[:35]:<36}{stats['count']:>7}{stats['failed']:>8}{stats['throughput_per_sec']:>8}"
+              f"{stats.get('p50', '-'):>8}{stats.get('p95', '-'):>8}{stats.get('p99', '-'):>8}")
+    memory = metrics_data['load']['memory']
+    if memory:
+        print(f"Memory ({metrics_data['load']['browsers']} browsers): peak {memory['peak_mb']} MB with "
+              f"{memory['peak_active_users']} user(s), about {memory.get('per_user_mb', '-')} MB per user")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
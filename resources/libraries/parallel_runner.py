@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dynamic work-queue parallel runner for Robot Framework suites.
+
+Tests are discovered up front and handed out to N worker slots from a
+shared queue. Every batch runs in its own ``robot`` process (and so its
+own Browser library node process); batches shrink as the queue drains so
+fast workers end up taking more tests. Worker outputs are combined into one
+suite tree in discovery order and can be fed straight into generate_metrics.
+
+Usage:
+    python3 resources/libraries/parallel_runner.py [options] <paths>... [-- <robot options>]
+"""
+
+import argparse
+import os
+import re
+import sys
+import queue
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional
+import psutil
+from robot import rebot
+from robot.api import TestSuiteBuilder, ExecutionResult
+from robot.utils.argumentparser import ArgFileParser
+
+# Make generate_metrics and browser_server importable from this directory
+sys.path.insert(0, str(Path(__file__).parent))
+from browser_server import acquire, release, lease_environment
+
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Robot return codes above 250 mean the run itself broke, not that tests failed
+ROBOT_RC_ERROR = 251
+DEFAULT_WORKER_MEMORY_MB = 768
+
+
+def discover_tests(paths: list[Path], name: Optional[str], includes: list[str], excludes: list[str],
+                   test_patterns: Optional[list[str]] = None) -> list[str]:
+    """Returns the full names of all tests selected by the given paths, test name patterns and tag filters."""
+    suite = TestSuiteBuilder().build(*[str(p) for p in paths])
+    if name:
+        suite.name = name
+    suite.filter(included_tests=test_patterns or None, included_tags=includes or None, excluded_tags=excludes or None)
+    tests = []
+
+    def collect(s):
+        tests.extend(t.full_name for t in s.tests)
+        for child in s.suites:
+            collect(child)
+
+    collect(suite)
+    logger.info(f"Discovered {len(tests)} test(s) in {', '.join(str(p) for p in paths)}")
+    return tests
+
+
+def escape_pattern(full_name: str) -> str:
+    """Escapes Robot glob characters so --test matches the name literally."""
+    return re.sub(r'([\[\]*?])', r'[\1]', full_name)
+
+
+def combine_outputs(outputs: list[Path], order: list[str]):
+    """
+    Combines the outputs of disjoint worker batches into one result.
+
+    Suites with the same name are folded together and tests are put back in
+    discovery order. Unlike ``rebot --merge`` this leaves test and suite
+    messages untouched.
+    """
+    results = [ExecutionResult(str(o)) for o in outputs]
+    combined = results[0]
+    for other in results[1:]:
+        _graft(combined.suite, other.suite)
+        for message in other.errors.messages:
+            combined.errors.messages.append(message)
+    position = {name: index for index, name in enumerate(order)}
+    _sort_suite(combined.suite, position)
+    return combined
+
+
+def _graft(target, source) -> None:
+    target.tests.extend(list(source.tests))
+    for child in source.suites:
+        match = next((s for s in target.suites if s.name == child.name), None)
+        if match is None:
+            target.suites.append(child)
+        else:
+            _graft(match, child)
+    if source.start_time and (not target.start_time or source.start_time < target.start_time):
+        target.start_time = source.start_time
+    if source.end_time and (not target.end_time or source.end_time > target.end_time):
+        target.end_time = source.end_time
+
+
+def _sort_suite(suite, position: dict) -> int:
+    """Orders tests and child suites by discovery position, returning the suite's first position."""
+    last = len(position)
+    suite.tests = sorted(suite.tests, key=lambda t: position.get(t.full_name, last))
+    firsts = {id(child): _sort_suite(child, position) for child in suite.suites}
+    suite.suites = sorted(suite.suites, key=lambda child: firsts[id(child)])
+    return min([position.get(t.full_name, last) for t in suite.tests] + list(firsts.values()) + [last])
+
+
+def auto_worker_count(worker_memory_mb: int = DEFAULT_WORKER_MEMORY_MB) -> int:
+    """Picks a worker count from CPU cores and currently available memory."""
+    cpus = os.cpu_count() or 1
+    by_memory = psutil.virtual_memory().available // (worker_memory_mb * 1024 * 1024)
+    count = max(1, min(cpus, int(by_memory)))
+    logger.info(f"Auto worker count: {count} (cpus={cpus}, memory allows {by_memory})")
+    return count
+
+
+class WorkQueue:
+    """Thread-safe queue of tests with guided batch sizes and crash requeueing."""
+
+    def __init__(self, tests: list[str], workers: int, max_batch: int, retries: int):
+        self._queue = queue.Queue()
+        for test in tests:
+            self._queue.put((test, 0))
+        self._workers = workers
+        self._max_batch = max_batch
+        self._retries = retries
+        self._pending = len(tests)
+        self._lock = threading.Lock()
+        self.crashed = []
+
+    def next_batch(self) -> Optional[list[tuple[str, int]]]:
+        """Returns the next batch, or None once every test has finished."""
+        while True:
+            with self._lock:
+                if self._pending == 0:
+                    return None
+                # Guided scheduling: big batches first, single tests at the end
+                size = max(1, min(self._max_batch, self._queue.qsize() // (self._workers * 2)))
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=0.5))
+                while len(batch) < size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                return batch
+
+    def done(self, batch: list[tuple[str, int]]) -> None:
+        with self._lock:
+            self._pending -= len(batch)
+
+    def requeue(self, batch: list[tuple[str, int]]) -> None:
+        """Puts the tests of a crashed batch back one by one, or gives up on them."""
+        with self._lock:
+            for test, attempt in batch:
+                if attempt < self._retries:
+                    self._queue.put((test, attempt + 1))
+                else:
+                    self.crashed.append(test)
+                    self._pending -= 1
+
+
+class Worker(threading.Thread):
+    """Runs batches from the queue in separate robot processes and streams their output."""
+
+    _print_lock = threading.Lock()
+
+    def __init__(self, worker_id: int, work: WorkQueue, paths: list[Path], output_dir: Path,
+                 name: Optional[str], robot_args: list[str], browser_server: bool = False):
+        super().__init__(name=f"worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self._work = work
+        self._paths = paths
+        self._output_dir = output_dir
+        self._suite_name = name
+        self._robot_args = robot_args
+        self._browser_server = browser_server
+        self.outputs = []
+        self._runs = 0
+
+    def run(self):
+        while True:
+            batch = self._work.next_batch()
+            if batch is None:
+                return
+            self._runs += 1
+            run_dir = self._output_dir / 'workers' / f"w{self.worker_id}-{self._runs:04d}"
+            rc = self._run_robot([test for test, _ in batch], run_dir)
+            output_xml = run_dir / 'output.xml'
+            # Killed by a signal (negative rc): RF streams output.xml, so a partial one may exist
+            if rc >= ROBOT_RC_ERROR or rc < 0 or not output_xml.exists():
+                logger.error(f"[w{self.worker_id}] robot crashed (rc={rc}) with {len(batch)} test(s), requeueing")
+                self._work.requeue(batch)
+                continue
+            self.outputs.append(output_xml)
+            self._work.done(batch)
+
+    def _run_robot(self, tests: list[str], run_dir: Path) -> int:
+        cmd = [sys.executable, '-m', 'robot', '--outputdir', str(run_dir),
+               '--output', 'output.xml', '--log', 'NONE', '--report', 'NONE',
+               '--console', 'dotted']
+        if self._suite_name:
+            cmd += ['--name', self._suite_name]
+        for test in tests:
+            cmd += ['--test', escape_pattern(test)]
+        cmd += self._robot_args + [str(p) for p in self._paths]
+        # Failure traces go next to the merged output.xml, not into the worker directory
+        env = dict(os.environ, ROBOT_WORKER_ID=str(self.worker_id),
+                   TRACE_DIR=str((self._output_dir / 'traces').resolve()))
+        lease = None
+        if self._browser_server:
+            lease = acquire(os.getenv('BROWSER', 'chromium'), os.getenv('HEADLESS', 'True').lower() == 'true',
+                            os.getpid(), f"worker {self.worker_id}")
+            if lease:
+                env.update(lease_environment(lease))
+        logger.debug(f"[w{self.worker_id}] {' '.join(cmd)}")
+        try:
+            process = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       text=True, errors='replace')
+        except OSError as e:
+            logger.error(f"[w{self.worker_id}] failed to start robot: {e}")
+            if lease:
+                release(lease)
+            return 255
+        for line in process.stdout:
+            with self._print_lock:
+                sys.stdout.write(f"[w{self.worker_id}] {line}")
+                sys.stdout.flush()
+        rc = process.wait()
+        if lease:
+            release(lease, recycle=rc >= ROBOT_RC_ERROR or rc < 0)
+        return rc
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Robot Framework tests in parallel from a shared work queue.')
+    parser.add_argument('paths', type=Path, nargs='+', help='Test data paths (e.g. tests/e2e)')
+    parser.add_argument('--max-workers', default='auto', help="Number of workers or 'auto' (default: auto)")
+    parser.add_argument('--max-batch', type=int, default=8, help='Maximum tests handed out at once (default: 8)')
+    parser.add_argument('--retries', type=int, default=1, help='Reruns of tests whose robot process crashed (default: 1)')
+    parser.add_argument('--outputdir', '-d', type=Path, default=Path('results'), help='Output directory (default: results)')
+    parser.add_argument('--name', '-N', help='Top level suite name')
+    parser.add_argument('--include', '-i', action='append', default=[], help='Include tag pattern')
+    parser.add_argument('--exclude', '-e', action='append', default=[], help='Exclude tag pattern')
+    parser.add_argument('--test', '-t', action='append', default=[], help='Test name pattern')
+    parser.add_argument('--runemptysuite', action='store_true', help='Exit successfully when no test is selected')
+    parser.add_argument('--argumentfile', '-A', help='Robot style argument file with more of these options '
+                                                    '(e.g. from impact_selector.py)')
+    parser.add_argument('--metrics-dir', type=Path, help='Generate the metrics report into this directory')
+    parser.add_argument('--browser-server', action='store_true',
+                        help='Lease warm node processes and browsers from a running browser_server.py')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    # Everything after '--' goes to robot untouched
+    argv, passthrough = sys.argv[1:], []
+    if '--' in argv:
+        split = argv.index('--')
+        argv, passthrough = argv[:split], argv[split + 1:]
+    argv = ArgFileParser(['--argumentfile', '-A']).process(argv)
+    args, robot_args = parser.parse_known_args(argv)
+    robot_args += passthrough
+    robot_args += [opt for tag in args.include for opt in ('--include', tag)]
+    robot_args += [opt for tag in args.exclude for opt in ('--exclude', tag)]
+
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    tests = discover_tests(args.paths, args.name, args.include, args.exclude, args.test)
+    if not tests:
+        if args.runemptysuite:
+            logger.info("No tests selected, nothing to run.")
+            sys.exit(0)
+        logger.error("No tests selected. Exiting.")
+        sys.exit(252)
+
+    workers_count = auto_worker_count() if args.max_workers == 'auto' else max(1, int(args.max_workers))
+    workers_count = min(workers_count, len(tests))
+    logger.info(f"Running {len(tests)} test(s) with {workers_count} worker(s)")
+
+    work = WorkQueue(tests, workers_count, args.max_batch, args.retries)
+    workers = [Worker(i + 1, work, args.paths, args.outputdir, args.name, robot_args, args.browser_server)
+               for i in range(workers_count)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    outputs = [output for worker in workers for output in worker.outputs]
+    if work.crashed:
+        logger.error(f"{len(work.crashed)} test(s) did not run because robot kept crashing:")
+        for test in work.crashed:
+            logger.error(f"  {test}")
+    if not outputs:
+        logger.error("No worker produced an output.xml. Exiting.")
+        sys.exit(ROBOT_RC_ERROR + 4)
+
+    # --- Combine Worker Outputs ---
+    logger.info(f"Combining {len(outputs)} worker output(s) into {args.outputdir}")
+    result = combine_outputs(outputs, tests)
+    merged = args.outputdir / 'output.xml'
+    result.save(str(merged))
+    with open(os.devnull, 'w') as devnull:
+        rebot(str(merged), outputdir=str(args.outputdir), output='NONE', stdout=devnull)
+
+    # --- Metrics Report ---
+    if args.metrics_dir:
+        from generate_metrics import collect_metrics, write_reports
+        metrics_data = collect_metrics(result, args.metrics_dir)
+        if metrics_data:
+            try:
+                write_reports(metrics_data, args.metrics_dir)
+            except Exception:
+                logger.error("Metrics report generation failed, see above.")
+
+    failed = result.statistics.total.failed + len(work.crashed)
+    logger.info(f"Done: {result.statistics.total.passed} passed, {failed} failed/crashed")
+    sys.exit(min(failed, 250))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Playwright node-method latency profiler.
+
+Streams Browser library ``playwright-log.txt`` files, pairs the
+"Start of node method X" / "End of node method X" lines per pid and
+reports latency distributions per node method. Given output.xml files it
+also splits each keyword's elapsed time into time spent inside Playwright
+and Robot/gRPC overhead.
+
+Usage:
+    python3 resources/libraries/playwright_profiler.py <playwright-log>... [--output-xml output.xml] [--json out.json]
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import sys
+from array import array
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from robot.api import ExecutionResult, ResultVisitor
+from compact_artifacts import open_artifact
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+START_PREFIX = 'Start of node method '
+END_PREFIX = 'End of node method '
+PERCENTILES = (50, 90, 95, 99)
+# Robot timestamps are local time; the auto offset is rounded to this granularity
+_OFFSET_GRANULARITY_SEC = 900
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def parse_node_calls(log_paths: list[Path]):
+    """
+    Streams playwright logs and returns (calls, unmatched_starts).
+
+    ``calls`` is a list of (start, end, method) tuples in epoch seconds,
+    sorted by start. Lines that are not JSON (node warnings) are skipped.
+    Logs compacted by compact_artifacts.py are read from their ``.gz``.
+    """
+    calls = []
+    unmatched = 0
+    for log_path in log_paths:
+        pending = defaultdict(deque)  # (pid, method) -> start times
+        with open_artifact(log_path) as f:  # Also reads logs compacted to .gz
+            for line in f:
+                # Cheap pre-filter so multi-GB logs are not fully JSON-decoded
+                if 'node method' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                msg = record.get('msg', '')
+                if msg.startswith(START_PREFIX):
+                    pending[(record.get('pid'), msg[len(START_PREFIX):])].append(_parse_time(record['time']))
+                elif msg.startswith(END_PREFIX):
+                    method = msg[len(END_PREFIX):]
+                    starts = pending.get((record.get('pid'), method))
+                    if starts:
+                        calls.append((starts.popleft(), _parse_time(record['time']), method))
+        unmatched += sum(len(starts) for starts in pending.values())
+        logger.info(f"Parsed {log_path}")
+    calls.sort()
+    logger.info(f"Paired {len(calls)} node method call(s), {unmatched} start(s) without end")
+    return calls, unmatched
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def method_latencies(calls) -> dict:
+    """Returns count, min/avg/max, total and percentiles (ms) per node method."""
+    durations = defaultdict(lambda: array('d'))
+    for start, end, method in calls:
+        durations[method].append((end - start) * 1000.0)
+    stats = {}
+    for method, values in durations.items():
+        ordered = sorted(values)
+        total = sum(ordered)
+        stats[method] = {
+            'count': len(ordered),
+            'min_ms': round(ordered[0], 1),
+            'avg_ms': round(total / len(ordered), 1),
+            'max_ms': round(ordered[-1], 1),
+            'total_ms': round(total, 1),
+            **{f"p{p}_ms": round(_percentile(ordered, p), 1) for p in PERCENTILES},
+        }
+    return dict(sorted(stats.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+
+class _KeywordWindows(ResultVisitor):
+    """Collects (start, end, name) of every executed keyword from a result."""
+
+    def __init__(self):
+        self.windows = []
+
+    def start_keyword(self, keyword):
+        if keyword.type not in ('KEYWORD', 'SETUP', 'TEARDOWN') or not keyword.start_time:
+            return
+        name = keyword.full_name if keyword.owner != 'BuiltIn' else keyword.name
+        start = keyword.start_time.timestamp()
+        self.windows.append((start, start + keyword.elapsed_time.total_seconds(), name))
+
+
+def keyword_windows(output_files: list[Path]) -> list:
+    visitor = _KeywordWindows()
+    for output in output_files:
+        ExecutionResult(str(output)).visit(visitor)
+    visitor.windows.sort()
+    return visitor.windows
+
+
+def estimate_utc_offset(calls, windows) -> float:
+    """
+    Estimates the offset between Robot (local time) and Playwright (UTC) timestamps
+    from the first newBrowser call and the first New Browser keyword.
+    """
+    first_call = next((start for start, _, method in calls if method == 'newBrowser'), None)
+    first_kw = next((start for start, _, name in windows if name.endswith('New Browser')), None)
+    if first_call is None or first_kw is None:
+        return 0.0
+    return round((first_kw - first_call) / _OFFSET_GRANULARITY_SEC) * _OFFSET_GRANULARITY_SEC
+
+
+def _covered_time(calls, starts, window_start: float, window_end: float) -> float:
+    """Seconds of [window_start, window_end] covered by at least one node call."""
+    # Calls are short; look back a little for calls that started before the window
+    index = bisect.bisect_left(starts, window_start - 60.0)
+    covered, cursor = 0.0, window_start
+    while index < len(calls) and calls[index][0] < window_end:
+        start, end, _ = calls[index]
+        index += 1
+        start, end = max(start, cursor), min(end, window_end)
+        if end > start:
+            covered += end - start
+            cursor = end
+    return covered
+
+
+def keyword_breakdown(calls, windows, offset: float) -> dict:
+    """Splits every keyword's time into Playwright time and Robot/gRPC overhead."""
+    shifted = [(start + offset, end + offset, method) for start, end, method in calls]
+    starts = [call[0] for call in shifted]
+    stats = {}
+    for start, end, name in windows:
+        entry = stats.setdefault(name, {'count': 0, 'robot_time': 0.0, 'playwright_time': 0.0})
+        entry['count'] += 1
+        entry['robot_time'] += end - start
+        entry['playwright_time'] += _covered_time(shifted, starts, start, end)
+    for entry in stats.values():
+        entry['overhead_time'] = round(max(0.0, entry['robot_time'] - entry['playwright_time']), 3)
+        entry['playwright_share'] = (round(entry['playwright_time'] / entry['robot_time'] * 100, 1)
+                                     if entry['robot_time'] else 0.0)
+        entry['robot_time'] = round(entry['robot_time'], 3)
+        entry['playwright_time'] = round(entry['playwright_time'], 3)
+    return dict(sorted(stats.items(), key=lambda item: item[1]['robot_time'], reverse=True))
+
+
+def build_profile(log_paths: list[Path], output_files: Optional[list[Path]] = None,
+                  utc_offset: Optional[float] = None) -> dict:
+    """Builds the ``playwright_profile`` section of metrics.json."""
+    calls, unmatched = parse_node_calls(log_paths)
+    profile = {
+        'log_files': [str(p) for p in log_paths],
+        'node_calls': len(calls),
+        'unmatched_starts': unmatched,
+        'methods': method_latencies(calls),
+        'keywords': {},
+    }
+    if output_files:
+        windows = keyword_windows(output_files)
+        offset = estimate_utc_offset(calls, windows) if utc_offset is None else utc_offset
+        profile['utc_offset_sec'] = offset
+        profile['keywords'] = keyword_breakdown(calls, windows, offset)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile Playwright node method latencies from playwright-log.txt files.')
+    parser.add_argument('logs', type=Path, nargs='+', help='playwright-log.txt file(s)')
+    parser.add_argument('--output-xml', type=Path, action='append', default=[],
+                        help='Robot output.xml to align keyword timings with (repeatable)')
+    parser.add_argument('--utc-offset-hours', type=float,
+                        help='Offset of Robot timestamps from UTC (default: estimated)')
+    parser.add_argument('--json', type=Path, help='Write the profile as JSON to this file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    offset = args.utc_offset_hours * 3600 if args.utc_offset_hours is not None else None
+    profile = build_profile(args.logs, args.output_xml, offset)
+
+    print(f"{'node method':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total ms':>12}")
+    for method, stats in profile['methods'].items():
+        print(f"{method:<32}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+              f"{stats['max_ms']:>10}{stats['total_ms']:>12}")
+    if profile['keywords']:
+        print()
+        print(f"{'keyword':<48}{'count':>7}{'robot s':>10}{'playwright s':>14}{'overhead s':>12}")
+        for name, stats in list(profile['keywords'].items())[:30]:
+            print(f"{name[:47]:<48}{stats['count']:>7}{stats['robot_time']:>10}"
+                  f"{stats['playwright_time']:>14}{stats['overhead_time']:>12}")
+    if args.json:
+        args.json.write_text(json.dumps(profile, indent=2), encoding='utf-8')
+        logger.info(f"Profile written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prebuilt search index for the metrics report.
+
+Builds a compact inverted index (token -> document ids) over suite and
+test names, tags, failure messages and keyword names from the metrics
+dictionary, so the report can filter without walking the metrics object.
+SEARCH_SCRIPT adds a search box to the report that hides non-matching
+rows as the user types (``?q=...`` pre-fills it).
+
+Index layout (JSON):
+    docs:     [[kind, name, location], ...]  kind 's' suite, 't' test, 'k' keyword;
+              location is the suite index path ('0/2'), plus '/t<n>' for tests,
+              or the key in all_keywords for keywords
+    terms:    sorted tokens, so the client can binary-search prefixes
+    postings: per term, delta-encoded ascending doc ids
+"""
+
+import re
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+# Failure messages can be huge (stack traces, page dumps); only their head is searchable
+MAX_MESSAGE_CHARS = 2000
+
+SEARCH_SCRIPT = r"""
+<script>
+(function () {
+  var index = window.SEARCH_INDEX;
+  if (!index) { return; }
+  var postings = index.postings.map(function (deltas) {
+    var ids = new Array(deltas.length), last = 0;
+    for (var i = 0; i < deltas.length; i++) { last += deltas[i]; ids[i] = last; }
+    return ids;
+  });
+  function lowerBound(prefix) {
+    var lo = 0, hi = index.terms.length;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (index.terms[mid] < prefix) { lo = mid + 1; } else { hi = mid; } }
+    return lo;
+  }
+  function matches(token) {
+    var ids = new Set();
+    for (var i = lowerBound(token); i < index.terms.length && index.terms[i].lastIndexOf(token, 0) === 0; i++) {
+      postings[i].forEach(function (id) { ids.add(id); });
+    }
+    return ids;
+  }
+  // Returns [{kind, name, location}] of documents matching every query token (prefix match)
+  window.searchMetrics = function (query, limit) {
+    var tokens = (query.toLowerCase().match(/[a-z0-9]+/g) || []);
+    if (!tokens.length) { return []; }
+    var result = null;
+    tokens.forEach(function (token) {
+      var ids = matches(token);
+      result = result === null ? ids : new Set(Array.from(result).filter(function (id) { return ids.has(id); }));
+    });
+    return Array.from(result).sort(function (a, b) { return a - b; }).slice(0, limit || 200).map(function (id) {
+      var doc = index.docs[id];
+      return {kind: doc[0], name: doc[1], location: doc[2]};
+    });
+  };
+
+  // Report rows that can be filtered: elements the template marks with data-search-location,
+  // otherwise table rows with a cell holding exactly a test or keyword name from the index.
+  // Looked up on every filter because the report renders its tables on demand.
+  var rowNames = new Set(index.docs.filter(function (doc) { return doc[0] !== 's'; }).map(function (doc) { return doc[1]; }));
+  function filterableRows() {
+    var rows = [];
+    var marked = document.querySelectorAll('[data-search-location]');
+    if (marked.length) {
+      marked.forEach(function (el) { rows.push({el: el, key: el.getAttribute('data-search-location')}); });
+      return rows;
+    }
+    var names = rowNames;
+    document.querySelectorAll('table tr').forEach(function (tr) {
+      for (var i = 0; i < tr.cells.length; i++) {
+        var text = tr.cells[i].textContent.trim();
+        if (names.has(text)) { rows.push({el: tr, name: text}); return; }
+      }
+    });
+    return rows;
+  }
+
+  function applyFilter(query) {
+    var found = window.searchMetrics(query, index.docs.length);
+    var tokens = query.toLowerCase().match(/[a-z0-9]+/g);
+    var locations = new Set(found.map(function (doc) { return doc.location; }));
+    var names = new Set(found.map(function (doc) { return doc.name; }));
+    filterableRows().forEach(function (row) {
+      var hit = !tokens || (row.key !== undefined ? locations.has(row.key) : names.has(row.name));
+      row.el.style.display = hit ? '' : 'none';
+    });
+    status.textContent = tokens ? found.length + ' match(es)' : '';
+  }
+
+  var box = document.createElement('div');
+  box.id = 'metrics-search';
+  box.style.cssText = 'position:fixed;top:8px;right:8px;z-index:1000;background:#fff;padding:4px 8px;' +
+    'border:1px solid #ccc;border-radius:4px;font:13px sans-serif';
+  var input = document.createElement('input');
+  input.type = 'search';
+  input.placeholder = 'Filter tests, tags, messages, keywords';
+  input.style.width = '260px';
+  var status = document.createElement('span');
+  status.style.marginLeft = '6px';
+  box.appendChild(input);
+  box.appendChild(status);
+  var pending = null;
+  input.addEventListener('input', function () {
+    clearTimeout(pending);
+    pending = setTimeout(function () { applyFilter(input.value); }, 80);
+  });
+  function mount() {
+    document.body.appendChild(box);
+    var initial = new URLSearchParams(location.search).get('q');
+    if (initial) { input.value = initial; applyFilter(initial); }
+  }
+  if (document.body) { mount(); } else { document.addEventListener('DOMContentLoaded', mount); }
+})();
+</script>
+"""
+
+
+def tokenize(text) -> set:
+    return set(_TOKEN_RE.findall(str(text).lower())) if text else set()
+
+
+def _step_keyword_names(steps, names: set) -> None:
+    for step in steps:
+        if step.get('type') in ('KEYWORD', 'SETUP', 'TEARDOWN'):
+            names.add(step['name'])
+        _step_keyword_names(step.get('children', []), names)
+
+
+def build_search_index(metrics_data: dict) -> dict:
+    """Builds the search index for a metrics dictionary produced by TestMetrics."""
+    docs = []
+    tokens = defaultdict(list)
+
+    def add(kind: str, name: str, location: str, text_tokens: set):
+        doc_id = len(docs)
+        docs.append([kind, name, location])
+        for token in text_tokens:
+            tokens[token].append(doc_id)
+
+    def walk(suite: dict, path: str):
+        add('s', suite['name'], path, tokenize(suite['name']))
+        for n, test in enumerate(suite.get('tests', [])):
+            keyword_names = set()
+            _step_keyword_names(test.get('steps', []), keyword_names)
+            text_tokens = tokenize(test['name']) | tokenize(test.get('message', '')[:MAX_MESSAGE_CHARS])
+            for value in list(test.get('tags', [])) + sorted(keyword_names):
+                text_tokens |= tokenize(value)
+            add('t', test['name'], f"{path}/t{n}", text_tokens)
+        for n, child in enumerate(suite.get('suites', [])):
+            walk(child, f"{path}/{n}")
+
+    for n, suite in enumerate(metrics_data.get('suites', [])):
+        walk(suite, str(n))
+    for name in metrics_data.get('all_keywords', {}):
+        add('k', name, name, tokenize(name))
+
+    terms = sorted(tokens)
+    postings = []
+    for term in terms:
+        # Doc ids are added in ascending order; deltas keep the JSON small
+        ids = tokens[term]
+        postings.append([ids[0]] + [b - a for a, b in zip(ids, ids[1:])])
+    logger.info(f"Search index: {len(docs)} document(s), {len(terms)} term(s)")
+    return {'docs': docs, 'terms': terms, 'postings': postings}